@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from urllib.parse import parse_qsl, urlsplit
+
+from cache import CacheLRU
+from crescimento import analisa_crescimento, mercados_em_crescimento
+from cubo import METRICAS
+from dados import deriva_tabelas
+from incremental import atualiza_fatos
+from ingestao import assinatura_datasets, descreve_dataset
+
+## API local (HTTP/JSON) com os mesmos números do painel, sem Streamlit
+#
+# Uso: python api.py --csv ExpVinho.csv --porta 8765
+#
+#   GET /datasets
+#   GET /totais?dataset=ExpVinho&ano_inicial=2009&ano_final=2023
+#   GET /top?n=10&metrica=Valor&ano_inicial=2009
+#   GET /serie?pais=Paraguai&ano_inicial=2015
+#   GET /crescimento?metrica=Quantidade&quantidade_minima=100&apenas_sempre_crescentes=true
+#
+# A tabela fato é carregada uma única vez (pelo mesmo snapshot do painel) e as consultas são
+# respondidas pelos cubos em memória. As respostas ficam em um cache LRU e levam um ETag:
+# um cliente que envia If-None-Match com o ETag atual recebe 304, sem corpo
+
+logger = logging.getLogger('api')
+
+class ErroConsulta(Exception):
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+def para_json(df):
+    # Registros do dataframe com tipos nativos do Python (NaN / NA viram null)
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+def parametro(consulta, nome, tipo=str, padrao=None):
+    if nome not in consulta:
+        return padrao
+    valor = consulta[nome]
+    try:
+        if tipo is bool:
+            if valor.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError(valor)
+            return valor.lower() in ('true', '1')
+        return tipo(valor)
+    except ValueError:
+        raise ErroConsulta(400, f'parâmetro inválido: {nome}={valor}')
+
+class ServicoConsultas:
+    # Dados carregados uma vez e as funções de cada rota, que devolvem objetos serializáveis em JSON
+
+    def __init__(self, caminhos_csv, ano_inicial=2009):
+        self.datasets = [descreve_dataset(caminho) for caminho in caminhos_csv]
+        self.ano_inicial = ano_inicial
+        df_fatos, cubos, _ = atualiza_fatos(self.datasets, ano_inicial=ano_inicial)
+        dados = deriva_tabelas(df_fatos, ano_inicial=ano_inicial, cubos=cubos)
+        self.cubos = dados['cubos']
+        self.crescimento = dados['crescimento']
+        # Identifica a versão dos dados carregados: entra no ETag de todas as respostas
+        self.versao = hashlib.sha1(assinatura_datasets(self.datasets, 'Brasil', ano_inicial)).hexdigest()[:12]
+        self.rotas = {
+            '/datasets': self.lista_datasets,
+            '/totais': self.totais,
+            '/top': self.top,
+            '/serie': self.serie,
+            '/crescimento': self.mercados_em_crescimento,
+        }
+
+    def cubo(self, consulta):
+        dataset = parametro(consulta, 'dataset', padrao=self.datasets[0]['dataset'])
+        if dataset not in self.cubos:
+            raise ErroConsulta(404, f'conjunto de dados desconhecido: {dataset}')
+        return dataset, self.cubos[dataset]
+
+    def intervalo(self, consulta, cubo):
+        ano_inicial = parametro(consulta, 'ano_inicial', int, self.ano_inicial)
+        ano_final = parametro(consulta, 'ano_final', int, int(cubo.anos[-1]))
+        if ano_inicial > ano_final:
+            raise ErroConsulta(400, 'ano_inicial maior que ano_final')
+        return ano_inicial, ano_final
+
+    def metrica(self, consulta, padrao):
+        metrica = parametro(consulta, 'metrica', padrao=padrao)
+        if metrica not in METRICAS:
+            raise ErroConsulta(400, f'métrica inválida: {metrica} (use {" ou ".join(METRICAS)})')
+        return metrica
+
+    def lista_datasets(self, consulta):
+        return [{**{chave: valor for chave, valor in dataset.items() if chave != 'arquivo'},
+                 'anos': [int(self.cubos[dataset['dataset']].anos[0]), int(self.cubos[dataset['dataset']].anos[-1])],
+                 'paises': len(self.cubos[dataset['dataset']].paises)}
+                for dataset in self.datasets if dataset['dataset'] in self.cubos]
+
+    def totais(self, consulta):
+        dataset, cubo = self.cubo(consulta)
+        ano_inicial, ano_final = self.intervalo(consulta, cubo)
+        por_ano = cubo.totais_por_ano(ano_inicial, ano_final)
+        return {'dataset': dataset, 'ano_inicial': ano_inicial, 'ano_final': ano_final,
+                'total': {metrica: int(por_ano[metrica].sum()) for metrica in METRICAS},
+                'por_ano': para_json(por_ano)}
+
+    def top(self, consulta):
+        dataset, cubo = self.cubo(consulta)
+        ano_inicial, ano_final = self.intervalo(consulta, cubo)
+        n = parametro(consulta, 'n', int, 10)
+        if n < 1:
+            raise ErroConsulta(400, 'n deve ser positivo')
+        metrica = self.metrica(consulta, 'Valor')
+        return {'dataset': dataset, 'ano_inicial': ano_inicial, 'ano_final': ano_final, 'metrica': metrica,
+                'paises': para_json(cubo.top(n, metrica, ano_inicial, ano_final).rename(columns={'Destino': 'País'}))}
+
+    def serie(self, consulta):
+        dataset, cubo = self.cubo(consulta)
+        ano_inicial, ano_final = self.intervalo(consulta, cubo)
+        pais = parametro(consulta, 'pais')
+        if pais is None:
+            raise ErroConsulta(400, 'parâmetro obrigatório: pais')
+        if pais not in cubo.indice:
+            raise ErroConsulta(404, f'país desconhecido: {pais}')
+        return {'dataset': dataset, 'pais': pais, 'ano_inicial': ano_inicial, 'ano_final': ano_final,
+                'serie': para_json(cubo.serie_df(pais, ano_inicial, ano_final))}
+
+    def mercados_em_crescimento(self, consulta):
+        dataset, cubo = self.cubo(consulta)
+        ano_inicial, ano_final = self.intervalo(consulta, cubo)
+        metrica = self.metrica(consulta, 'Quantidade')
+
+        # O intervalo padrão já foi calculado junto com os demais dados; outros intervalos são
+        # calculados na hora (uma passada vetorizada sobre o cubo) e guardados no cache de respostas
+        if metrica == 'Quantidade' and ano_inicial == self.ano_inicial and ano_final == int(cubo.anos[-1]):
+            df_crescimento = self.crescimento[dataset]
+        else:
+            df_crescimento = analisa_crescimento(cubo, metrica, ano_inicial, ano_final)
+
+        df_mercados = mercados_em_crescimento(df_crescimento,
+                                              quantidade_minima=parametro(consulta, 'quantidade_minima', int, 100),
+                                              apenas_sempre_crescentes=parametro(consulta, 'apenas_sempre_crescentes', bool, True))
+        return {'dataset': dataset, 'ano_inicial': ano_inicial, 'ano_final': ano_final, 'metrica': metrica,
+                'mercados': para_json(df_mercados)}
+
+    def responde(self, caminho, consulta):
+        # Corpo JSON (bytes) e ETag da consulta
+        if caminho not in self.rotas:
+            raise ErroConsulta(404, f'rota desconhecida: {caminho}')
+        corpo = json.dumps(self.rotas[caminho](consulta), ensure_ascii=False, allow_nan=False).encode('utf-8')
+        return corpo, '"' + self.versao + '-' + hashlib.sha1(corpo).hexdigest()[:16] + '"'
+
+## Servidor HTTP (asyncio, apenas biblioteca padrão)
+
+MOTIVOS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+TAMANHO_MAXIMO_CABECALHO = 16 * 1024
+
+class ServidorApi:
+
+    def __init__(self, servico, maximo_cache=256):
+        self.servico = servico
+        self.cache = CacheLRU(maximo=maximo_cache)
+
+    def consulta(self, alvo):
+        # A chave do cache é a rota com os parâmetros ordenados, para que a ordem na URL não importe
+        url = urlsplit(alvo)
+        parametros = tuple(sorted(parse_qsl(url.query)))
+        return self.cache.obtem((url.path, parametros), lambda: self.servico.responde(url.path, dict(parametros)))
+
+    async def trata_conexao(self, leitor, escritor):
+        # Conexões persistentes (HTTP/1.1 keep-alive): várias requisições por conexão
+        try:
+            while True:
+                requisicao = await self.le_requisicao(leitor)
+                if requisicao is None:
+                    break
+                metodo, alvo, versao, cabecalhos = requisicao
+                # HTTP/1.1 mantém a conexão por padrão; HTTP/1.0 só com 'Connection: keep-alive'
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao == 'keep-alive' or (versao != 'HTTP/1.0' and conexao != 'close')
+                escritor.write(self.resposta(metodo, alvo, cabecalhos, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            escritor.close()
+
+    async def le_requisicao(self, leitor):
+        linha = await leitor.readline()
+        if not linha:
+            return None
+        partes = linha.decode('latin-1').split()
+        if len(partes) != 3:
+            raise ConnectionError('linha de requisição inválida')
+
+        cabecalhos = {}
+        tamanho = len(linha)
+        while True:
+            linha = await leitor.readline()
+            tamanho += len(linha)
+            if tamanho > TAMANHO_MAXIMO_CABECALHO:
+                raise ConnectionError('cabeçalho muito grande')
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        # As rotas não recebem corpo: um eventual corpo é descartado para não misturar requisições
+        if int(cabecalhos.get('content-length', 0) or 0):
+            await leitor.readexactly(int(cabecalhos['content-length']))
+        return partes[0], partes[1], partes[2], cabecalhos
+
+    def resposta(self, metodo, alvo, cabecalhos, manter):
+        extras = {}
+        if metodo not in ('GET', 'HEAD'):
+            status, corpo, extras = 405, self.erro('método não suportado'), {'Allow': 'GET, HEAD'}
+        else:
+            try:
+                corpo, etag = self.consulta(alvo)
+                extras = {'ETag': etag, 'Cache-Control': 'no-cache'}
+                # If-None-Match usa comparação fraca: o prefixo W/ é ignorado
+                etags_cliente = [valor.strip().removeprefix('W/') for valor in cabecalhos.get('if-none-match', '').split(',')]
+                status = 304 if etag in etags_cliente or '*' in etags_cliente else 200
+            except ErroConsulta as erro:
+                status, corpo = erro.status, self.erro(str(erro))
+            except Exception:
+                logger.exception('erro ao responder %s', alvo)
+                status, corpo = 500, self.erro('erro interno')
+
+        # 304 não tem corpo nem Content-Length; HEAD informa o tamanho do corpo, sem enviá-lo
+        linhas = [f'HTTP/1.1 {status} {MOTIVOS[status]}', 'Content-Type: application/json; charset=utf-8']
+        if status != 304:
+            linhas.append(f'Content-Length: {len(corpo)}')
+        if status == 304 or metodo == 'HEAD':
+            corpo = b''
+        linhas.append(f"Connection: {'keep-alive' if manter else 'close'}")
+        linhas += [f'{nome}: {valor}' for nome, valor in extras.items()]
+        return ('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + corpo
+
+    def erro(self, mensagem):
+        return json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8')
+
+async def executa(servidor, host, porta):
+    async with await asyncio.start_server(servidor.trata_conexao, host, porta, limit=TAMANHO_MAXIMO_CABECALHO) as tcp:
+        logger.info('API em http://%s:%s', host, porta)
+        await tcp.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='API local (HTTP/JSON) com os dados agregados de exportação.')
+    parser.add_argument('--csv', nargs='+', default=['ExpVinho.csv'], help='arquivos CSV da Embrapa')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--ano-inicial', type=int, default=2009, help='mesmo padrão do painel, que usa o mesmo snapshot')
+    parser.add_argument('--cache', type=int, default=256, help='número máximo de respostas no cache')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+    servidor = ServidorApi(ServicoConsultas(args.csv, args.ano_inicial), args.cache)
+    try:
+        asyncio.run(executa(servidor, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
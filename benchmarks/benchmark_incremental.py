@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmark_reshape import gera_arquivo_largo
+from benchmark_snapshot import mede, remove_snapshots
+from dados import deriva_tabelas
+from incremental import atualiza_fatos
+from ingestao import caminho_snapshot_fatos, descreve_dataset
+
+## Benchmark: ano novo acrescentado ao CSV, atualização incremental x ingestão completa
+#
+# Mede o que a página faz quando a Embrapa publica um ano novo: incremental.atualiza_fatos seguido de
+# deriva_tabelas. No incremental só as colunas do ano novo são lidas e gravadas em uma parte nova do
+# snapshot, com os cubos desse ano; na ingestão completa todos os anos são relidos e os cubos refeitos
+
+ANO_INICIAL = 2009
+
+def grava_csv(df, caminho):
+    df.to_csv(caminho, sep=';', index=False, header=['Id', 'País'] + [str(1970 + i // 2) for i in range(len(df.columns) - 2)])
+
+def carrega(datasets):
+    df_fatos, cubos, reprocessados = atualiza_fatos(datasets, ano_inicial=ANO_INICIAL)
+    deriva_tabelas(df_fatos, ano_inicial=ANO_INICIAL, cubos=cubos)
+    return reprocessados
+
+if __name__ == '__main__':
+    print(f"{'cenário':<26}{'completa (s)':>14}{'incremental (s)':>17}{'ganho':>10}")
+    for n_paises, n_anos in [(1_000, 54), (5_000, 54), (20_000, 54)]:
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'ExpVinho.csv')
+            datasets = [descreve_dataset(caminho)]
+            snapshots = os.path.dirname(caminho_snapshot_fatos(datasets, ano_inicial=ANO_INICIAL))
+            copia = os.path.join(diretorio, 'snapshots_base')
+
+            # Snapshot do arquivo com n_anos, guardado para ser restaurado antes de cada repetição
+            df = gera_arquivo_largo(n_paises, n_anos + 1)
+            grava_csv(df.iloc[:, :-2], caminho)
+            carrega(datasets)
+            shutil.copytree(snapshots, copia)
+
+            def restaura():
+                remove_snapshots(datasets)
+                shutil.copytree(copia, snapshots)
+
+            grava_csv(df, caminho)
+            restaura()
+            assert carrega(datasets) == {'ExpVinho': [1970 + n_anos]}
+
+            tempo_completo = mede(lambda: carrega(datasets), 3, prepara=lambda: remove_snapshots(datasets))
+            tempo_incremental = mede(lambda: carrega(datasets), 3, prepara=restaura)
+            nome = f'sintético {n_paises}x{n_anos}+1'
+            print(f'{nome:<26}{tempo_completo:>14.4f}{tempo_incremental:>17.4f}{tempo_completo / tempo_incremental:>9.1f}x')
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmark_reshape import gera_arquivo_largo, transforma_com_loop
+from dados import transforma_largo_para_longo
+from esquema import relatorio_memoria, sem_esquema
+from ingestao import descreve_dataset, transforma_bloco
+
+## Relatório de memória: tabela longa com e sem o esquema compacto (esquema.py)
+#
+# Uso: python benchmarks/benchmark_memoria.py --csv ExpVinho.csv ImpVinhos.csv
+
+def formata_bytes(quantidade):
+    return f'{quantidade / 1024 / 1024:,.2f} MB'
+
+def imprime(nome, relatorio):
+    print(f'\n{nome}')
+    tabela = relatorio.assign(bytes_antes=relatorio['bytes_antes'].map(formata_bytes),
+                              bytes_depois=relatorio['bytes_depois'].map(formata_bytes),
+                              reducao=relatorio['reducao'].map('{:.1%}'.format))
+    print(tabela.to_string())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Uso de memória da tabela longa antes e depois do esquema compacto.')
+    parser.add_argument('--csv', nargs='+', default=[os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')])
+    args = parser.parse_args()
+
+    # Antes: a tabela como o loop original a construía (texto repetido em cada linha, inteiros de 64 bits)
+    df_largo = pd.read_csv(args.csv[0], sep=';')
+    imprime(f'{os.path.basename(args.csv[0])} (loop original x esquema)',
+            relatorio_memoria(transforma_com_loop(df_largo), transforma_largo_para_longo(df_largo)))
+
+    # Tabela fato combinada de todos os CSVs informados
+    datasets = [descreve_dataset(caminho) for caminho in args.csv]
+    df_fatos = pd.concat([transforma_bloco(pd.read_csv(d['arquivo'], sep=';'), d) for d in datasets], ignore_index=True)
+    df_fatos = df_fatos.astype({coluna: 'category' for coluna in ['Dataset', 'Produto', 'Direcao', 'Origem', 'Destino']})
+    imprime(f'tabela fato ({len(datasets)} arquivos)', relatorio_memoria(sem_esquema(df_fatos), df_fatos))
+
+    # Tabelas sintéticas maiores, no mesmo layout
+    for n_paises, n_anos in [(1_000, 54), (10_000, 100)]:
+        df_resultado = transforma_largo_para_longo(gera_arquivo_largo(n_paises, n_anos))
+        total = relatorio_memoria(sem_esquema(df_resultado), df_resultado).loc['Total']
+        print(f"\nsintético {n_paises}x{n_anos} ({len(df_resultado)} linhas): "
+              f"{formata_bytes(total['bytes_antes'])} -> {formata_bytes(total['bytes_depois'])} ({total['reducao']:.1%} menos)")
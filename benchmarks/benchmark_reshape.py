@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dados import transforma_largo_para_longo
+from esquema import sem_esquema
+
+## Benchmark: loop com df.iterrows() (implementação original) x reshape vetorizado
+
+def transforma_com_loop(df):
+    # Cópia da implementação original do tech_challenge_1.py, usada como referência
+    anos = [str(coluna).split('.')[0] for coluna in df.columns[2::2]]
+    ids, paises, anos_list, quantidades, valores = [], [], [], [], []
+    for i, row in df.iterrows():
+        for ano_index in range(len(anos)):
+            ids.append(row.iloc[0])
+            paises.append(row.iloc[1])
+            anos_list.append(anos[ano_index])
+            quantidades.append(row.iloc[2 + 2 * ano_index])
+            valores.append(row.iloc[2 + 2 * ano_index + 1])
+
+    df_resultado = pd.DataFrame({'Id': ids, 'Destino': paises, 'Ano': anos_list,
+                                 'Quantidade': quantidades, 'Valor': valores})
+    df_resultado['Ano'] = df_resultado['Ano'].astype(int)
+    df_resultado['Origem'] = 'Brasil'
+    return df_resultado[['Id', 'Origem', 'Destino', 'Ano', 'Quantidade', 'Valor']]
+
+def gera_arquivo_largo(n_paises, n_anos, semente=0):
+    # Gera um dataframe sintético no mesmo layout do ExpVinho.csv
+    rng = np.random.default_rng(semente)
+    colunas = ['Id', 'País']
+    for ano in range(1970, 1970 + n_anos):
+        colunas += [str(ano), f'{ano}.1']
+    medidas = rng.integers(0, 1_000_000, size=(n_paises, 2 * n_anos))
+    df = pd.DataFrame(medidas, columns=colunas[2:])
+    df.insert(0, 'País', [f'País {i}' for i in range(n_paises)])
+    df.insert(0, 'Id', np.arange(1, n_paises + 1))
+    return df
+
+def mede(funcao, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+if __name__ == '__main__':
+    caminho_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')
+    cenarios = [('ExpVinho.csv', pd.read_csv(caminho_csv, sep=';'))]
+    cenarios += [(f'sintético {n_paises}x{n_anos}', gera_arquivo_largo(n_paises, n_anos))
+                 for n_paises, n_anos in [(1_000, 54), (5_000, 100)]]
+
+    print(f"{'cenário':<24}{'linhas':>10}{'loop (s)':>12}{'vetorizado (s)':>16}{'ganho':>10}")
+    for nome, df in cenarios:
+        esperado = transforma_com_loop(df)
+        obtido = transforma_largo_para_longo(df)
+        pd.testing.assert_frame_equal(esperado, sem_esquema(obtido), check_dtype=False)
+
+        tempo_loop = mede(transforma_com_loop, df, 1)
+        tempo_vetorizado = mede(transforma_largo_para_longo, df, 5)
+        print(f'{nome:<24}{len(obtido):>10}{tempo_loop:>12.4f}{tempo_vetorizado:>16.4f}{tempo_loop / tempo_vetorizado:>9.0f}x')
@@ -0,0 +1,50 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmark_reshape import gera_arquivo_largo
+from incremental import atualiza_fatos
+from ingestao import caminho_snapshot_fatos, descreve_dataset
+
+## Benchmark: tempo de carga na inicialização, sem snapshot x com o snapshot da tabela fato
+#
+# Mede o mesmo caminho da página, da API e do relatório (incremental.atualiza_fatos): na primeira
+# carga a tabela fato é ingerida dos CSVs e gravada em .snapshots/fatos-<hash>.*; nas
+# seguintes o snapshot é validado pela assinatura e lido via memory-map
+
+def mede(funcao, repeticoes, prepara=None):
+    tempos = []
+    for _ in range(repeticoes):
+        if prepara:
+            prepara()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def remove_snapshots(datasets):
+    shutil.rmtree(os.path.dirname(caminho_snapshot_fatos(datasets)), ignore_errors=True)
+
+if __name__ == '__main__':
+    caminho_csv = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Cópia do CSV real, para não apagar os snapshots ao lado do arquivo do projeto
+        cenarios = [('ExpVinho.csv', shutil.copy(caminho_csv, diretorio))]
+        for n_paises, n_anos in [(1_000, 54), (10_000, 100)]:
+            caminho = os.path.join(diretorio, f'sintetico_{n_paises}x{n_anos}', 'ExpVinho.csv')
+            os.makedirs(os.path.dirname(caminho))
+            gera_arquivo_largo(n_paises, n_anos).to_csv(caminho, sep=';', index=False,
+                                                          header=['Id', 'País'] + [str(1970 + i // 2) for i in range(2 * n_anos)])
+            cenarios.append((f'sintético {n_paises}x{n_anos}', caminho))
+
+        print(f"{'cenário':<26}{'CSV (s)':>10}{'snapshot (s)':>14}{'ganho':>10}")
+        for nome, caminho in cenarios:
+            datasets = [descreve_dataset(caminho)]
+            tempo_csv = mede(lambda: atualiza_fatos(datasets), 3, prepara=lambda: remove_snapshots(datasets))
+            tempo_snapshot = mede(lambda: atualiza_fatos(datasets), 5)
+            print(f'{nome:<26}{tempo_csv:>10.4f}{tempo_snapshot:>14.4f}{tempo_csv / tempo_snapshot:>9.1f}x')
@@ -0,0 +1,162 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmark_reshape import gera_arquivo_largo, transforma_com_loop
+from crescimento import analisa_crescimento, mercados_em_crescimento
+from cubo import CuboAgregado
+from dados import agrupa_por_destino, transforma_largo_para_longo
+from formatacao import formata_numero, formata_numeros, formata_valor, formata_valores
+from graficos import plota_grafico_pais_valor_ano_linha, plota_top10_importadores, plota_total_por_ano, renderiza_figura
+from ranking import RankingDestinos
+
+## Suíte de benchmarks por etapa do pipeline do tech_challenge_1.py
+#
+# Uso: python benchmarks/suite.py --escalas 1 10 100 --saida resultado.json
+#      python benchmarks/suite.py --compara resultado_anterior.json
+#
+# A escala multiplica o número de células (países x anos) do ExpVinho.csv: países e anos
+# crescem cada um pela raiz quadrada da escala
+
+CAMINHO_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')
+
+def is_increasing(group):
+    # Cópia do filtro original, usada como referência da análise de crescimento
+    return group['Quantidade'].is_monotonic_increasing
+
+def filtro_is_increasing(df_resultado):
+    df_crescimento = df_resultado.groupby('Destino', observed=True).filter(is_increasing)
+    df_crescimento = df_crescimento.query('Destino != "Brasil"')
+    quantity_sum = df_crescimento.groupby('Destino', observed=True)['Quantidade'].sum()
+    return df_crescimento[df_crescimento['Destino'].isin(quantity_sum[quantity_sum >= 100].index)]
+
+def mede(funcao, repeticoes):
+    # Menor tempo entre as repetições (o menos afetado por ruído do sistema)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {'segundos': min(tempos), 'repeticoes': repeticoes}
+
+def prepara_cenario(escala, diretorio):
+    if escala == 1:
+        return 'ExpVinho.csv', CAMINHO_CSV
+
+    n_paises, n_anos = (round(137 * math.sqrt(escala)), round(54 * math.sqrt(escala)))
+    caminho = os.path.join(diretorio, f'sintetico_{escala}x.csv')
+    cabecalho = ['Id', 'País'] + [str(1970 + i // 2) for i in range(2 * n_anos)]
+    gera_arquivo_largo(n_paises, n_anos, semente=escala).to_csv(caminho, sep=';', index=False, header=cabecalho)
+    return f'sintético {escala}x', caminho
+
+def executa_cenario(nome, caminho, repeticoes, limite_loop):
+    etapas = {}
+
+    etapas['read_csv'] = mede(lambda: pd.read_csv(caminho, sep=';'), repeticoes)
+    df = pd.read_csv(caminho, sep=';')
+
+    # O loop original é O(linhas x anos) em Python: só é medido até o limite de linhas
+    linhas = len(df) * (len(df.columns) - 2) // 2
+    if linhas <= limite_loop:
+        etapas['reshape_loop'] = mede(lambda: transforma_com_loop(df), 1)
+    etapas['reshape_vetorizado'] = mede(lambda: transforma_largo_para_longo(df), repeticoes)
+    df_resultado = transforma_largo_para_longo(df)
+
+    etapas['groupby_destino'] = mede(lambda: agrupa_por_destino(df_resultado), repeticoes)
+    df_agrupado = agrupa_por_destino(df_resultado)
+
+    etapas['ranking_construcao'] = mede(lambda: RankingDestinos(df_agrupado), repeticoes)
+    ranking = RankingDestinos(df_agrupado)
+    etapas['ranking_pagina'] = mede(lambda: ranking.pagina(2, 25, 'Quantidade', busca='a'), repeticoes)
+
+    etapas['filtro_is_increasing'] = mede(lambda: filtro_is_increasing(df_resultado), repeticoes)
+    etapas['cubo'] = mede(lambda: CuboAgregado.de_tabela(df_resultado), repeticoes)
+    cubo = CuboAgregado.de_tabela(df_resultado)
+    # Os totais por ano saem do cubo (não há mais groupby por ano)
+    etapas['totais_por_ano'] = mede(lambda: cubo.totais_por_ano(), repeticoes)
+    etapas['crescimento_vetorizado'] = mede(lambda: mercados_em_crescimento(analisa_crescimento(cubo)), repeticoes)
+
+    etapas['formata_valor_map'] = mede(lambda: df_agrupado['Valor'].map(formata_valor), repeticoes)
+    etapas['formata_numero_map'] = mede(lambda: df_agrupado['Quantidade'].map(formata_numero), repeticoes)
+    etapas['formata_valores_vetorizado'] = mede(lambda: formata_valores(df_agrupado['Valor']), repeticoes)
+    etapas['formata_numeros_vetorizado'] = mede(lambda: formata_numeros(df_agrupado['Quantidade']), repeticoes)
+
+    # Os gráficos usam os últimos 15 anos, como a página
+    ano_inicial = int(cubo.anos[-1]) - 14
+    df_exp_por_ano = cubo.totais_por_ano(ano_inicial=ano_inicial)
+    top10 = cubo.top(10, 'Valor', ano_inicial=ano_inicial)
+    serie = cubo.serie_df(top10['Destino'].iloc[0], ano_inicial=ano_inicial)
+    graficos = {
+        'grafico_total_quantidade': ((6, 3), lambda ax: plota_total_por_ano(df_exp_por_ano, 'Quantidade', 'purple', 't', 'y', 30, ax=ax)),
+        'grafico_total_valor': ((6, 3.08), lambda ax: plota_total_por_ano(df_exp_por_ano, 'Valor', 'green', 't', 'y', 25, ax=ax)),
+        'grafico_top10': ((12, 6), lambda ax: plota_top10_importadores(top10, ax=ax)),
+        'grafico_pais': ((6, 3.4), lambda ax: plota_grafico_pais_valor_ano_linha(serie, 'red', 'País', 1_000_000, ax=ax)),
+    }
+    for etapa, (figsize, desenha) in graficos.items():
+        etapas[etapa] = mede(lambda: renderiza_figura(figsize, desenha), repeticoes)
+
+    return {'nome': nome, 'paises': len(df), 'anos': (len(df.columns) - 2) // 2, 'linhas': len(df_resultado), 'etapas': etapas}
+
+def compara(atual, anterior, tolerancia):
+    # Etapas que ficaram mais lentas que a execução anterior além da tolerância (ex.: 0.2 = 20%)
+    anteriores = {c['nome']: c['etapas'] for c in anterior['cenarios']}
+    regressoes = []
+    for cenario in atual['cenarios']:
+        for etapa, medida in cenario['etapas'].items():
+            base = anteriores.get(cenario['nome'], {}).get(etapa)
+            if base and medida['segundos'] > base['segundos'] * (1 + tolerancia):
+                regressoes.append({'cenario': cenario['nome'], 'etapa': etapa, 'anterior': base['segundos'],
+                                   'atual': medida['segundos'], 'razao': medida['segundos'] / base['segundos']})
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks por etapa do pipeline, com saída em JSON.')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100], help='escalas (1000 é suportada, mas demorada)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--limite-loop', type=int, default=200_000, help='máximo de linhas para medir o loop original')
+    parser.add_argument('--saida', help='arquivo JSON de saída (padrão: stdout)')
+    parser.add_argument('--compara', help='JSON de uma execução anterior, para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    resultado = {
+        'ambiente': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                     'matplotlib': matplotlib.__version__, 'plataforma': platform.platform(), 'cpus': os.cpu_count()},
+        'cenarios': [],
+    }
+    with tempfile.TemporaryDirectory() as diretorio:
+        for escala in args.escalas:
+            nome, caminho = prepara_cenario(escala, diretorio)
+            print(f'executando {nome}...', file=sys.stderr)
+            repeticoes = args.repeticoes if escala < 1000 else 1
+            resultado['cenarios'].append({'escala': escala, **executa_cenario(nome, caminho, repeticoes, args.limite_loop)})
+
+    if args.compara:
+        with open(args.compara, encoding='utf-8') as arquivo:
+            resultado['regressoes'] = compara(resultado, json.load(arquivo), args.tolerancia)
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    if resultado.get('regressoes'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
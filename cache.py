@@ -0,0 +1,36 @@
+import threading
+from collections import OrderedDict
+
+## Cache LRU em memória, usado para as figuras (graficos.py) e as respostas da API (api.py)
+
+class CacheLRU:
+    # Cache LRU (least recently used) com número máximo de entradas. O valor é gerado fora do
+    # lock, então várias threads podem consultar o cache enquanto outra calcula um valor novo
+
+    def __init__(self, maximo=64):
+        self.maximo = maximo
+        self._valores = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obtem(self, chave, gera):
+        with self._lock:
+            if chave in self._valores:
+                self._valores.move_to_end(chave)
+                self.acertos += 1
+                return self._valores[chave]
+
+        # O cálculo acontece fora do lock para não bloquear as outras sessões
+        valor = gera()
+
+        with self._lock:
+            self.falhas += 1
+            self._valores[chave] = valor
+            self._valores.move_to_end(chave)
+            while len(self._valores) > self.maximo:
+                self._valores.popitem(last=False)
+        return valor
+
+    def __len__(self):
+        return len(self._valores)
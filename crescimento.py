@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+## Análise vetorizada de crescimento dos mercados (sobre a matriz país x ano do cubo)
+
+def sequencias_de_alta(matriz):
+    # Para cada país, a sequência atual (terminando no último ano) e a maior sequência
+    # de anos consecutivos com aumento estrito da métrica
+    n_paises, n_anos = matriz.shape
+    if n_anos < 2:
+        vazio = np.zeros(n_paises, dtype=np.int64)
+        return vazio, vazio
+
+    alta = np.diff(matriz, axis=1) > 0
+
+    # Sequência atual: quantidade de altas seguidas contadas a partir do fim
+    atual = np.cumprod(alta[:, ::-1], axis=1).sum(axis=1)
+
+    # Maior sequência: distância de cada posição até a última queda (ou estabilidade) anterior
+    posicoes = np.arange(1, n_anos)
+    ultima_quebra = np.maximum.accumulate(np.where(alta, 0, posicoes), axis=1)
+    maior = (posicoes - ultima_quebra).max(axis=1)
+    return atual, maior
+
+def cagr(matriz, anos):
+    # Taxa de crescimento anual composta entre o primeiro ano com valor positivo e o último ano.
+    # Fica NaN quando o país não tem ao menos dois anos a partir da primeira exportação
+    if matriz.shape[1] == 0:
+        return np.full(len(matriz), np.nan)
+
+    positivo = matriz > 0
+    inicio = positivo.argmax(axis=1)
+    valor_inicial = matriz[np.arange(len(matriz)), inicio].astype(np.float64)
+    valor_final = matriz[:, -1].astype(np.float64)
+    periodos = (anos[-1] - anos[inicio]).astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taxa = (valor_final / valor_inicial) ** (1 / periodos) - 1
+    return np.where(positivo.any(axis=1) & (periodos > 0), taxa, np.nan)
+
+def inclinacao(matriz, anos):
+    # Coeficiente angular da regressão linear da métrica pelo ano, para todos os países de uma vez
+    x = anos - anos.mean()
+    y = matriz - matriz.mean(axis=1, keepdims=True)
+    return (y * x).sum(axis=1) / (x ** 2).sum()
+
+def primeiro_ano(matriz, anos):
+    # Primeiro ano com valor positivo entre os anos do cubo (nulo para países sem nenhuma exportação).
+    # O cubo começa no ano inicial da ingestão, então um país que já comprava antes dele aparece
+    # com o próprio ano inicial: é o primeiro ano desde o início da série carregada
+    positivo = matriz > 0
+    return pd.Series(anos[positivo.argmax(axis=1)], dtype='Int64').where(positivo.any(axis=1))
+
+def analisa_crescimento(cubo, metrica='Quantidade', ano_inicial=None, ano_final=None):
+    # Indicadores de crescimento de todos os países no intervalo de anos, em uma única passada
+    inicio, fim = cubo.intervalo(ano_inicial, ano_final)
+    matriz = cubo.medidas[metrica][:, inicio:fim]
+    anos = cubo.anos[inicio:fim]
+
+    atual, maior = sequencias_de_alta(matriz)
+
+    return pd.DataFrame({
+        'País': cubo.paises,
+        'Total': matriz.sum(axis=1),
+        # Mesmo critério do is_increasing original (Series.is_monotonic_increasing, não estrito).
+        # Um intervalo sem nenhum ano do cubo não marca nenhum país como crescente
+        'SempreCrescente': (np.diff(matriz, axis=1) >= 0).all(axis=1) & (matriz.shape[1] > 0),
+        'SequenciaAtual': atual,
+        'MaiorSequencia': maior,
+        'CAGR': cagr(matriz, anos),
+        'Inclinacao': inclinacao(matriz, anos) if len(anos) > 1 else np.nan,
+        # Calculado sobre todos os anos carregados, não só o intervalo pedido
+        'PrimeiroAno': primeiro_ano(cubo.medidas[metrica], cubo.anos),
+    })
+
+def mercados_em_crescimento(df_crescimento, quantidade_minima=100, apenas_sempre_crescentes=True, excluir=('Brasil',)):
+    # Filtra os mercados em crescimento e ordena pelos que mais crescem por ano
+    filtro = (df_crescimento['Total'] >= quantidade_minima) & ~df_crescimento['País'].isin(excluir)
+    if apenas_sempre_crescentes:
+        filtro &= df_crescimento['SempreCrescente']
+
+    return df_crescimento[filtro].sort_values(by=['Inclinacao', 'Total'], ascending=False).reset_index(drop=True)
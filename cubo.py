@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+## Cubo pré-agregado país x ano para consultas rápidas
+
+METRICAS = ['Quantidade', 'Valor']
+
+class CuboAgregado:
+    # Guarda Quantidade e Valor em matrizes densas (países x anos), com um dicionário
+    # nome do país -> linha. Totais de qualquer intervalo de anos saem das somas acumuladas,
+    # sem percorrer a tabela longa novamente
+
+    def __init__(self, paises, anos, medidas):
+        self.paises = np.asarray(paises, dtype=object)
+        self.anos = np.asarray(anos, dtype=np.int64)
+        self.indice = {pais: linha for linha, pais in enumerate(self.paises)}
+        self.medidas = medidas
+
+        # Soma acumulada por país ao longo dos anos, com uma coluna de zeros no início:
+        # o total entre as colunas i e j é acumulado[:, j] - acumulado[:, i]
+        self._acumulado = {
+            metrica: np.concatenate([np.zeros((len(self.paises), 1), dtype=np.int64), matriz.cumsum(axis=1)], axis=1)
+            for metrica, matriz in medidas.items()
+        }
+        self._por_ano = {metrica: matriz.sum(axis=0) for metrica, matriz in medidas.items()}
+
+    @classmethod
+    def de_tabela(cls, df_resultado, coluna_pais='Destino'):
+        codigos, paises = pd.factorize(df_resultado[coluna_pais], sort=True)
+        anos = np.arange(df_resultado['Ano'].min(), df_resultado['Ano'].max() + 1, dtype=np.int64)
+        posicoes = df_resultado['Ano'].to_numpy(dtype=np.int64) - anos[0]
+
+        medidas = {}
+        for metrica in METRICAS:
+            matriz = np.zeros((len(paises), len(anos)), dtype=np.int64)
+            np.add.at(matriz, (codigos, posicoes), df_resultado[metrica].to_numpy(dtype=np.int64))
+            medidas[metrica] = matriz
+        return cls(np.asarray(paises, dtype=object), anos, medidas)
+
+    @classmethod
+    def de_blocos(cls, blocos):
+        # Soma blocos (países, anos, medidas) com quaisquer países e anos: os blocos de linhas do
+        # CSV largo, em que cada linha já é um país, ou os anos acrescentados depois da ingestão.
+        # Países repetidos são somados, na ordem em que aparecem pela primeira vez
+        blocos = [(np.asarray(paises, dtype=object), np.asarray(anos, dtype=np.int64), medidas)
+                  for paises, anos, medidas in blocos]
+        codigos, paises = pd.factorize(np.concatenate([paises for paises, _, _ in blocos]))
+        anos = np.arange(min(anos[0] for _, anos, _ in blocos), max(anos[-1] for _, anos, _ in blocos) + 1)
+
+        medidas = {metrica: np.zeros((len(paises), len(anos)), dtype=np.int64) for metrica in METRICAS}
+        inicio = 0
+        for paises_bloco, anos_bloco, medidas_bloco in blocos:
+            linhas = codigos[inicio:inicio + len(paises_bloco), None]
+            inicio += len(paises_bloco)
+            for metrica in METRICAS:
+                np.add.at(medidas[metrica], (linhas, anos_bloco - anos[0]), medidas_bloco[metrica])
+        return cls(np.asarray(paises, dtype=object), anos, medidas)
+
+    def intervalo(self, ano_inicial=None, ano_final=None):
+        # Posições das colunas (início inclusivo, fim exclusivo) para o intervalo de anos
+        inicio = 0 if ano_inicial is None else int(np.searchsorted(self.anos, ano_inicial, side='left'))
+        fim = len(self.anos) if ano_final is None else int(np.searchsorted(self.anos, ano_final, side='right'))
+        return inicio, fim
+
+    def matriz(self, metrica, ano_inicial=None, ano_final=None):
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        return self.medidas[metrica][:, inicio:fim]
+
+    def totais(self, metrica, ano_inicial=None, ano_final=None):
+        # Total de cada país no intervalo de anos
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        acumulado = self._acumulado[metrica]
+        return acumulado[:, fim] - acumulado[:, inicio]
+
+    def total(self, pais, metrica, ano_inicial=None, ano_final=None):
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        acumulado = self._acumulado[metrica][self.indice[pais]]
+        return int(acumulado[fim] - acumulado[inicio])
+
+    def serie(self, pais, metrica, ano_inicial=None, ano_final=None):
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        return self.medidas[metrica][self.indice[pais], inicio:fim]
+
+    def serie_df(self, pais, ano_inicial=None, ano_final=None):
+        # Série anual de um país no formato esperado pelas funções de gráfico (Ano/Quantidade/Valor)
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        linha = self.indice[pais]
+        return pd.DataFrame({'Ano': self.anos[inicio:fim],
+                             **{metrica: self.medidas[metrica][linha, inicio:fim] for metrica in METRICAS}})
+
+    def totais_por_ano(self, ano_inicial=None, ano_final=None):
+        inicio, fim = self.intervalo(ano_inicial, ano_final)
+        return pd.DataFrame({'Ano': self.anos[inicio:fim],
+                             **{metrica: self._por_ano[metrica][inicio:fim] for metrica in METRICAS}})
+
+    def top(self, n=10, metrica='Valor', ano_inicial=None, ano_final=None):
+        # Os n maiores países pela métrica no intervalo, com as duas métricas somadas
+        totais = {m: self.totais(m, ano_inicial, ano_final) for m in METRICAS}
+        ordem = np.lexsort((-totais['Quantidade' if metrica == 'Valor' else 'Valor'], -totais[metrica]))[:n]
+        return pd.DataFrame({'Destino': self.paises[ordem], **{m: totais[m][ordem] for m in METRICAS}})
+
+def coluna_pais(direcao):
+    # O país parceiro é o destino nas exportações e a origem nas importações
+    return 'Origem' if direcao == 'importacao' else 'Destino'
+
+def constroi_cubos(df_resultado):
+    # Um cubo por conjunto de dados da tabela fato
+    if 'Dataset' not in df_resultado.columns:
+        return {None: CuboAgregado.de_tabela(df_resultado)}
+
+    cubos = {}
+    for (dataset, direcao), df_dataset in df_resultado.groupby(['Dataset', 'Direcao'], observed=True):
+        cubos[dataset] = CuboAgregado.de_tabela(df_dataset, coluna_pais=coluna_pais(direcao))
+    return cubos
+
+## Cubos gravados junto com o snapshot da tabela fato (ver ingestao.py)
+
+def grava_cubos(caminho, blocos):
+    # Um .npz com os países, anos e medidas de cada conjunto de dados (dataset -> bloco)
+    arrays = {}
+    for dataset, (paises, anos, medidas) in blocos.items():
+        arrays[f'{dataset}/paises'] = np.asarray(paises, dtype=str)
+        arrays[f'{dataset}/anos'] = np.asarray(anos, dtype=np.int64)
+        for metrica in METRICAS:
+            arrays[f'{dataset}/{metrica}'] = medidas[metrica]
+    with open(caminho, 'wb') as arquivo:
+        np.savez(arquivo, **arrays)
+
+def le_cubos(caminho):
+    # Devolve dataset -> bloco (países, anos, medidas), para ser somado com CuboAgregado.de_blocos
+    campos = {}
+    with np.load(caminho) as arquivo:
+        for chave in arquivo.files:
+            dataset, campo = chave.rsplit('/', 1)
+            campos.setdefault(dataset, {})[campo] = arquivo[chave]
+    return {dataset: (campo['paises'], campo['anos'], {metrica: campo[metrica] for metrica in METRICAS})
+            for dataset, campo in campos.items()}
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from crescimento import analisa_crescimento
+from cubo import constroi_cubos
+from esquema import TIPO_ANO, TIPO_ID, TIPO_MEDIDA, categorica_constante, categorica_repetida, converte_inteiros
+from instrumentacao import etapa
+from ranking import RankingDestinos
+
+## Funções de manipulação dos dados de exportação
+
+COLUNAS_LONGO = ['Id', 'Origem', 'Destino', 'Ano', 'Quantidade', 'Valor']
+
+def anos_do_cabecalho(colunas):
+    # O cabeçalho do arquivo repete cada ano duas vezes (Quantidade;Valor) e o pandas
+    # renomeia a segunda ocorrência como '1970.1', por isso lemos apenas as colunas pares
+    return np.array([int(str(coluna).split('.')[0]) for coluna in colunas[::2]], dtype=np.int64)
+
+def anos_do_arquivo(caminho, ano_inicial=None):
+    # Anos do cabeçalho do CSV (>= ano_inicial): só a primeira linha do arquivo é lida
+    with open(caminho, encoding='utf-8-sig') as arquivo:
+        colunas = [coluna.strip('"') for coluna in arquivo.readline().rstrip('\r\n').split(';')]
+    anos = anos_do_cabecalho(colunas[2:])
+    return anos if ano_inicial is None else anos[anos >= ano_inicial]
+
+def colunas_dos_anos(caminho, anos):
+    # Posições de Id, País e dos pares de colunas dos anos informados. São passadas ao
+    # read_csv como usecols, para que as demais colunas nunca cheguem a ser carregadas
+    posicoes = [0, 1]
+    for i, ano in enumerate(anos_do_arquivo(caminho)):
+        if ano in anos:
+            posicoes += [2 + 2 * i, 3 + 2 * i]
+    return posicoes
+
+def colunas_a_partir_de(caminho, ano_inicial=None):
+    # Colunas dos anos >= ano_inicial: os anos anteriores nunca são carregados
+    if ano_inicial is None:
+        return None
+    return colunas_dos_anos(caminho, set(anos_do_arquivo(caminho, ano_inicial).tolist()))
+
+def transforma_largo_para_longo(df, origem='Brasil'):
+    # Converte o dataframe largo (Id;País;1970;1970;...) no formato longo
+    # Id/Origem/Destino/Ano/Quantidade/Valor usando reshape do NumPy, sem iterar linha a linha.
+    # A tabela já nasce com os tipos compactos do esquema (ver esquema.py)
+    anos = converte_inteiros(anos_do_cabecalho(df.columns[2:]), TIPO_ANO, 'Ano')
+    n_paises, n_anos = len(df), len(anos)
+
+    # Matriz (países x anos x 2), onde o último eixo separa Quantidade e Valor
+    medidas = df.iloc[:, 2:2 + 2 * n_anos].to_numpy(dtype=np.int64).reshape(n_paises, n_anos, 2)
+
+    return pd.DataFrame({
+        'Id': np.repeat(converte_inteiros(df.iloc[:, 0].to_numpy(dtype=np.int64), TIPO_ID, 'Id'), n_anos),
+        'Origem': categorica_constante(origem, n_paises * n_anos),
+        'Destino': categorica_repetida(df.iloc[:, 1].to_numpy(dtype=object), n_anos),
+        'Ano': np.tile(anos, n_paises),
+        'Quantidade': converte_inteiros(medidas[:, :, 0].ravel(), TIPO_MEDIDA, 'Quantidade'),
+        'Valor': converte_inteiros(medidas[:, :, 1].ravel(), TIPO_MEDIDA, 'Valor'),
+    }, columns=COLUNAS_LONGO)
+
+def assinatura_arquivo(caminho):
+    # Data de modificação e tamanho do arquivo: usados como chave de cache, de forma que
+    # qualquer alteração no CSV invalide automaticamente os dados já calculados
+    info = os.stat(caminho)
+    return (os.path.abspath(caminho), info.st_mtime_ns, info.st_size)
+
+# Colunas que identificam o conjunto de dados na tabela fato combinada (ver ingestao.py).
+# As agregações nunca somam produtos ou direções diferentes entre si
+DIMENSOES_DATASET = ['Direcao', 'Produto']
+
+def dimensoes(df_resultado):
+    return [coluna for coluna in DIMENSOES_DATASET if coluna in df_resultado.columns]
+
+def agrupa_por_destino(df_resultado):
+    chaves = dimensoes(df_resultado) + ['Origem','Destino']
+    df_agrupado = df_resultado.groupby(by=chaves, observed=True)[['Quantidade','Valor']].sum().reset_index()
+
+    #ordenar por Quantidade e Valor
+    return df_agrupado.sort_values(by=['Valor','Quantidade'], ascending=False, kind='stable').reset_index(drop=True)
+
+def deriva_tabelas(df_resultado, ano_inicial=2009, cubos=None):
+    # O cubo guarda todos os anos da tabela fato, para permitir consultas de qualquer intervalo.
+    # A ingestão já começa no ano inicial, então o cubo também começa nele (não há anos anteriores).
+    # Os cubos gravados com o snapshot (incremental.atualiza_fatos) são usados como estão
+    if cubos is None:
+        with etapa('agregacao.cubos', linhas=len(df_resultado)):
+            cubos = constroi_cubos(df_resultado)
+
+    #filtrando apenas a partir do ano inicial
+    df_resultado = df_resultado.query('Ano >= @ano_inicial')
+
+    with etapa('agregacao.destino', linhas=len(df_resultado)):
+        df_agrupado_destino = agrupa_por_destino(df_resultado)
+
+    # Ranking com a ordem de cada métrica pré-calculada, usado na tabela paginada da página
+    with etapa('agregacao.ranking', linhas=len(df_agrupado_destino)):
+        ranking_destino = RankingDestinos(df_agrupado_destino)
+
+    # Indicadores de crescimento de todos os países de cada conjunto de dados, a partir do ano inicial
+    with etapa('agregacao.crescimento'):
+        crescimento = {dataset: analisa_crescimento(cubo, ano_inicial=ano_inicial) for dataset, cubo in cubos.items()}
+
+    return {
+        'cubos': cubos,
+        'ranking_destino': ranking_destino,
+        'crescimento': crescimento,
+    }
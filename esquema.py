@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+## Esquema compacto da tabela longa e da tabela fato
+#
+# Países e identificadores dos conjuntos de dados como categóricas (um código por linha e cada
+# nome guardado uma única vez), Id e Ano em int16 e Quantidade / Valor em int32. As somas
+# (groupby do pandas, cubo) são sempre feitas em int64
+
+# Versão do esquema, incluída na assinatura dos snapshots: snapshots gravados com outros tipos são refeitos
+VERSAO_ESQUEMA = 2
+
+TIPO_ID = np.int16
+TIPO_ANO = np.int16
+TIPO_MEDIDA = np.int32
+
+TIPOS_LONGO = {
+    'Id': TIPO_ID,
+    'Origem': 'category',
+    'Destino': 'category',
+    'Ano': TIPO_ANO,
+    'Quantidade': TIPO_MEDIDA,
+    'Valor': TIPO_MEDIDA,
+}
+
+TIPOS_FATOS = {'Dataset': 'category', 'Produto': 'category', 'Direcao': 'category', **TIPOS_LONGO}
+
+# Colunas e tipos gravados no arquivo Arrow da tabela fato combinada
+ESQUEMA_FATOS = pa.schema([
+    ('Dataset', pa.string()),
+    ('Produto', pa.string()),
+    ('Direcao', pa.string()),
+    ('Id', pa.int16()),
+    ('Origem', pa.string()),
+    ('Destino', pa.string()),
+    ('Ano', pa.int16()),
+    ('Quantidade', pa.int32()),
+    ('Valor', pa.int32()),
+])
+
+# Tipos da tabela sem o esquema (texto em objetos do Python e inteiros de 64 bits), usados no relatório de memória
+TIPOS_SEM_ESQUEMA = {'category': object, TIPO_ID: np.int64, TIPO_ANO: np.int64, TIPO_MEDIDA: np.int64}
+
+def converte_inteiros(valores, tipo, coluna):
+    # Converte para o tipo compacto, com erro explícito em vez de overflow silencioso
+    valores = np.asarray(valores)
+    limites = np.iinfo(tipo)
+    if len(valores) and (valores.min() < limites.min or valores.max() > limites.max):
+        raise ValueError(f'{coluna}: valores fora do intervalo de {np.dtype(tipo).name} ({valores.min()} a {valores.max()})')
+    return valores.astype(tipo)
+
+def categorica_repetida(valores, repeticoes):
+    # Cada valor repetido 'repeticoes' vezes, criando só os códigos (os nomes não são copiados por linha).
+    # Categorias em ordem alfabética, a mesma ordem dos grupos do groupby sobre texto
+    codigos, categorias = pd.factorize(np.asarray(valores, dtype=object), sort=True)
+    return pd.Categorical.from_codes(np.repeat(codigos, repeticoes), categories=categorias)
+
+def categorica_constante(valor, linhas):
+    return pd.Categorical.from_codes(np.zeros(linhas, dtype=np.int8), categories=[valor])
+
+def sem_esquema(df):
+    # A mesma tabela com os tipos anteriores ao esquema: base de comparação do relatório de memória
+    return df.astype({coluna: TIPOS_SEM_ESQUEMA[tipo] for coluna, tipo in TIPOS_FATOS.items() if coluna in df.columns})
+
+def relatorio_memoria(df_antes, df_depois):
+    # Bytes por coluna (incluindo o conteúdo das strings) antes e depois do esquema
+    antes = df_antes.memory_usage(deep=True, index=False)
+    depois = df_depois.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        'tipo_antes': df_antes.dtypes.astype(str),
+        'bytes_antes': antes,
+        'tipo_depois': df_depois.dtypes.astype(str),
+        'bytes_depois': depois,
+    })
+    relatorio.loc['Total'] = ['', antes.sum(), '', depois.sum()]
+    relatorio['reducao'] = 1 - relatorio['bytes_depois'] / relatorio['bytes_antes']
+    return relatorio
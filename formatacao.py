@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+## Funções de formatação no padrão brasileiro
+
+def formata_valor(valor):
+    return f'US$ {round(valor,2):,.2f}'.replace(',', 'v').replace('.', ',').replace('v', '.')
+
+def formata_numero(numero):
+    return "{:,}".format(numero).replace(',', '.')
+
+## Versões vetorizadas, para colunas inteiras
+#
+# Montam os textos de toda a coluna em uma matriz de bytes (uma linha por valor, bytes nulos
+# nas posições vazias) e criam a coluna de strings do Arrow direto desses bytes, sem criar um
+# objeto str do Python por valor. A saída é a mesma de formata_valor / formata_numero (para inteiros
+# acima de 2**53, formata_valor perde precisão ao passar por float; aqui o valor é exato)
+
+def _constante(texto, linhas):
+    return np.broadcast_to(np.frombuffer(texto.encode(), dtype=np.uint8), (linhas, len(texto)))
+
+def _sinal(negativos):
+    return np.where(negativos, ord('-'), 0).astype(np.uint8)[:, None]
+
+def _digitos_com_milhares(inteiros):
+    # Inteiros não negativos -> dígitos alinhados à direita, com '.' a cada 3 dígitos
+    n_digitos = len(str(int(inteiros.max()))) if len(inteiros) else 1
+    matriz = np.zeros((len(inteiros), n_digitos + (n_digitos - 1) // 3), dtype=np.uint8)
+    resto = inteiros.copy()
+    coluna = matriz.shape[1] - 1
+    for posicao in range(n_digitos):
+        if posicao and posicao % 3 == 0:
+            matriz[:, coluna] = np.where(resto > 0, ord('.'), 0)
+            coluna -= 1
+        resto, digito = np.divmod(resto, 10)
+        # Zeros à esquerda ficam nulos (o primeiro dígito sempre aparece, para o valor 0)
+        matriz[:, coluna] = np.where((resto > 0) | (digito > 0) | (posicao == 0), digito + ord('0'), 0)
+        coluna -= 1
+    return matriz
+
+def _coluna_de_texto(serie, partes):
+    # Concatena as partes e remove os bytes nulos: o tamanho de cada texto vira o offset do Arrow
+    matriz = np.hstack(partes)
+    ocupado = matriz != 0
+    offsets = np.zeros(len(matriz) + 1, dtype=np.int32)
+    np.cumsum(ocupado.sum(axis=1), out=offsets[1:])
+    textos = pa.StringArray.from_buffers(len(matriz), pa.py_buffer(offsets), pa.py_buffer(matriz[ocupado]))
+    return pd.Series(pd.arrays.ArrowStringArray(textos), index=serie.index, name=serie.name)
+
+def formata_numeros(serie):
+    numeros = serie.to_numpy(dtype=np.int64)
+    return _coluna_de_texto(serie, [_sinal(numeros < 0), _digitos_com_milhares(np.abs(numeros))])
+
+def formata_valores(serie):
+    # Valores em centavos: inteiros são exatos, decimais são arredondados para 2 casas
+    valores = serie.to_numpy()
+    if np.issubdtype(valores.dtype, np.integer):
+        negativos = valores < 0
+        inteiros = np.abs(valores.astype(np.int64))
+        centavos = np.zeros(len(valores), dtype=np.int64)
+    else:
+        valores = valores.astype(np.float64)
+        arredondados = np.round(valores * 100)
+        # Nos empates de meio centavo o round() do Python (decimal exato) pode divergir do numpy
+        empates = np.flatnonzero(np.abs(np.abs(valores * 100) % 1 - 0.5) < 1e-6)
+        arredondados[empates] = [round(round(valor, 2) * 100) for valor in valores[empates].tolist()]
+        negativos = np.signbit(arredondados)
+        inteiros, centavos = np.divmod(np.abs(arredondados).astype(np.int64), 100)
+
+    linhas = len(valores)
+    return _coluna_de_texto(serie, [_constante('US$ ', linhas), _sinal(negativos), _digitos_com_milhares(inteiros),
+                                    _constante(',', linhas), (centavos[:, None] // [10, 1] % 10 + ord('0')).astype(np.uint8)])
@@ -0,0 +1,159 @@
+import hashlib
+import io
+
+import pandas as pd
+import seaborn as sns
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+## Funções de criação dos gráficos
+
+# Textos padrão dos títulos (exportação de vinhos de mesa). O relatório passa os do conjunto de dados escolhido
+DESCRICAO_PAIS = 'de vinhos importados pelo(a) {pais}'
+TITULO_TOP10 = 'Top 10 maiores importadores de vinho em dólares (US$)'
+
+def plota_grafico_pais_valor_ano_linha(data, cor, pais, divisor=1, ax=None, descricao=DESCRICAO_PAIS):
+    if ax is None:
+        ax = plt.gca()
+
+    sns.lineplot(x=data['Ano'], y=data['Valor']/divisor, data=data, marker='o', lw=3, color=cor, ax=ax)
+    # Adiciona título
+    ax.set_title(titulo_pais(pais, divisor, descricao), loc='left', fontsize=12)
+
+    # Configurações adicionais do gráfico
+    ax.set_xlabel('', fontsize=10)
+    ax.set_ylabel('Valor em dólares', fontsize=10)
+    ax.set_xticks(data['Ano'])
+
+    # Ajusta o tamanho da fonte dos ticks
+    ax.tick_params(axis='x', labelsize=8, labelrotation=45)  # Tamanho da fonte dos ticks do eixo x
+    ax.tick_params(axis='y', labelsize=8)  # Tamanho da fonte dos ticks do eixo y
+
+    sns.despine(ax=ax)
+    ax.grid(True, linestyle='--')
+
+def plota_total_por_ano(df_exp_por_ano, coluna, cor, titulo, rotulo_y, limite_y=None, ax=None):
+    # Gráfico de linha com o total por ano (em milhões), usado para Quantidade e Valor.
+    # Sem limite_y o topo do eixo se ajusta aos dados
+    if ax is None:
+        ax = plt.gca()
+
+    sns.lineplot(x=df_exp_por_ano['Ano'], y=df_exp_por_ano[coluna]/1000000, data=df_exp_por_ano, marker='o', lw=3, color=cor, ax=ax)
+
+    # Adiciona título
+    ax.set_title(titulo, loc='left', fontsize=12)
+
+    # Configurações adicionais do gráfico
+    ax.set_xlabel('', fontsize=10)
+    ax.set_ylabel(rotulo_y, fontsize=10)
+    ax.set_xticks(df_exp_por_ano['Ano'])
+    ax.set_ylim(0, limite_y)
+
+    # Ajusta o tamanho da fonte dos ticks
+    ax.tick_params(axis='x', labelsize=8, labelrotation=45)  # Tamanho da fonte dos ticks do eixo x
+    ax.tick_params(axis='y', labelsize=8)  # Tamanho da fonte dos ticks do eixo y
+
+    sns.despine(ax=ax)
+    ax.grid(True, linestyle='--')
+
+def plota_top10_importadores(df_resultado_agrupado_destino, ax=None, titulo=TITULO_TOP10, periodo='2009 à 2023'):
+    # Gráfico de barras do top 10 importadores. O eixo x vai até um pouco além da maior barra,
+    # para caber o rótulo com o valor
+    if ax is None:
+        ax = plt.gca()
+
+    top10 = df_resultado_agrupado_destino.head(10)
+
+    sns.barplot(x=top10['Valor'] / 1000000,
+                y=top10['Destino'],
+                data=top10, orient='h',
+                hue=top10['Destino'],
+                palette='viridis', ax=ax)
+
+    # Configurações adicionais do gráfico
+    ax.set_xlabel('', fontsize=18)
+    ax.set_ylabel('', fontsize=18)
+    ax.set_xlim(0, limite_top10(top10))
+
+    # Ajusta o tamanho da fonte dos ticks
+    ax.tick_params(bottom=False, labelbottom=False)
+    ax.tick_params(axis='y', labelsize=14)  # Tamanho da fonte dos ticks do eixo y
+
+    # Adiciona título
+    ax.set_title(f'{titulo}\n{periodo}', loc='left', fontsize=20)
+
+    # Adicionar os valores no final das barras
+    for index, value in enumerate(top10['Valor'] / 1000000):
+        ax.text(value, index, f'{round(value,2)} milhões de doláres', va='center', ha='left')
+
+    sns.despine(ax=ax)
+    ax.grid(True, linestyle='--')
+
+## Especificações Vega-Lite (gráficos desenhados no navegador)
+
+# Cada função devolve os pontos agregados do gráfico (poucas dezenas de linhas) e a
+# especificação Vega-Lite equivalente ao gráfico do matplotlib acima
+
+def titulo_pais(pais, divisor, descricao=DESCRICAO_PAIS):
+    if divisor == 1_000_000:
+        return f'Total em milhões de dólares (US$) {descricao.format(pais=pais)}'
+    return f'Total em dólares (US$) {descricao.format(pais=pais)}'
+
+def limite_top10(top10):
+    return max(1.3 * top10['Valor'].max() / 1000000, 1) if len(top10) else 1
+
+def especificacao_linha(titulo, rotulo_y, cor, altura, dominio_y=None):
+    escala_y = {'domain': list(dominio_y)} if dominio_y else {}
+    return {
+        'title': {'text': titulo, 'anchor': 'start', 'fontSize': 14},
+        'height': altura,
+        'mark': {'type': 'line', 'point': True, 'strokeWidth': 3, 'color': cor},
+        'encoding': {
+            'x': {'field': 'Ano', 'type': 'ordinal', 'title': None, 'axis': {'labelAngle': -45}},
+            'y': {'field': 'y', 'type': 'quantitative', 'title': rotulo_y, 'scale': escala_y},
+            'tooltip': [{'field': 'Ano', 'type': 'ordinal'}, {'field': 'y', 'type': 'quantitative', 'title': rotulo_y, 'format': ',.2f'}],
+        },
+    }
+
+def vega_grafico_pais_valor_ano_linha(data, cor, pais, divisor=1, altura=250, descricao=DESCRICAO_PAIS):
+    pontos = pd.DataFrame({'Ano': data['Ano'].to_numpy(), 'y': data['Valor'].to_numpy() / divisor})
+    return pontos, especificacao_linha(titulo_pais(pais, divisor, descricao), 'Valor em dólares', cor, altura)
+
+def vega_total_por_ano(df_exp_por_ano, coluna, cor, titulo, rotulo_y, limite_y=None, altura=250):
+    pontos = pd.DataFrame({'Ano': df_exp_por_ano['Ano'].to_numpy(), 'y': df_exp_por_ano[coluna].to_numpy() / 1000000})
+    return pontos, especificacao_linha(titulo, rotulo_y, cor, altura, dominio_y=(0, limite_y) if limite_y else None)
+
+def vega_top10_importadores(df_resultado_agrupado_destino, altura=450, titulo=TITULO_TOP10, periodo='2009 à 2023'):
+    top10 = df_resultado_agrupado_destino.head(10)
+    pontos = pd.DataFrame({'Destino': top10['Destino'].astype(str).to_numpy(), 'y': top10['Valor'].to_numpy() / 1000000})
+    pontos['rotulo'] = [f'{round(valor,2)} milhões de doláres' for valor in pontos['y']]
+
+    eixo_y = {'field': 'Destino', 'type': 'nominal', 'sort': None, 'title': None, 'axis': {'labelFontSize': 14}}
+    return pontos, {
+        'title': {'text': [titulo, periodo], 'anchor': 'start', 'fontSize': 20},
+        'height': altura,
+        'encoding': {'y': eixo_y, 'x': {'field': 'y', 'type': 'quantitative', 'title': None, 'axis': None,
+                                        'scale': {'domain': [0, limite_top10(top10)]}}},
+        'layer': [
+            {'mark': 'bar', 'encoding': {'color': {'field': 'Destino', 'type': 'nominal', 'sort': None, 'legend': None,
+                                                   'scale': {'scheme': 'viridis'}}}},
+            {'mark': {'type': 'text', 'align': 'left', 'dx': 4}, 'encoding': {'text': {'field': 'rotulo'}}},
+        ],
+    }
+
+## Renderização e cache das figuras
+
+def renderiza_figura(figsize, desenha, formato='png', dpi=200):
+    # Cria a figura, desenha com a função recebida e devolve os bytes da imagem.
+    # A Figure é criada direto, fora do pyplot: não entra no gerenciador global de figuras,
+    # então várias sessões podem renderizar ao mesmo tempo e não há nada para fechar
+    fig = Figure(figsize=figsize)
+    desenha(fig.subplots())
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=formato, dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+def impressao_digital(data):
+    # Hash do conteúdo do dataframe, usado na chave do cache para que dados novos gerem uma nova figura
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from cubo import METRICAS, constroi_cubos
+from dados import anos_do_arquivo, colunas_dos_anos
+from ingestao import (assinatura_datasets, assinaturas_arquivos, caminho_snapshot_fatos, grava_estado, grava_parte,
+                      ingere_datasets, le_csv_largo, le_estado, le_fatos, remove_partes)
+
+## Atualização incremental da tabela fato quando novos anos são acrescentados aos CSVs
+#
+# A cada ano a Embrapa acrescenta um par de colunas (2024;2024) ao fim de cada arquivo. Os anos
+# novos são identificados só pelo cabeçalho, comparado com os anos já gravados no estado do
+# snapshot, e apenas essas colunas são lidas do CSV (usecols, em blocos). As linhas novas e os cubos
+# desses anos são gravados em uma parte nova do snapshot, sem reler nem regravar as partes anteriores.
+#
+# Qualquer outra mudança (valores alterados sem ano novo, anos removidos ou fora de ordem, linhas
+# acrescentadas ou removidas) refaz a ingestão completa. Valores de anos antigos revisados no
+# mesmo arquivo em que um ano foi acrescentado não são detectados pelo cabeçalho: para esse caso
+# a ingestão completa (ingestao.ingere_datasets) continua disponível, e verifica_incremental
+# compara as duas
+
+def planeja_acrescimo(estado, datasets, arquivos, ano_inicial):
+    # Anos novos de cada arquivo alterado, ou None quando a mudança não é só um acréscimo de anos
+    plano = {}
+    for dataset in datasets:
+        nome = dataset['dataset']
+        if estado['arquivos'][nome] == arquivos[nome]:
+            continue
+
+        anos = anos_do_arquivo(dataset['arquivo'], ano_inicial).tolist()
+        anteriores = estado['anos'][nome]
+        if len(anos) <= len(anteriores) or anos[:len(anteriores)] != anteriores:
+            return None
+        plano[nome] = anos[len(anteriores):]
+    return plano or None
+
+def acrescenta_anos(destino, estado, datasets, plano, assinatura, arquivos, pais_base, tamanho_bloco):
+    # Grava uma parte com os anos novos e o estado que a inclui. Devolve None (e descarta a parte)
+    # se as linhas do arquivo mudaram, caso em que a ingestão completa é necessária
+    alterados = [dataset for dataset in datasets if dataset['dataset'] in plano]
+
+    def le_blocos(dataset):
+        # Com só os anos novos, cada linha tem poucas colunas: o bloco cresce na mesma proporção,
+        # mantendo a quantidade de células de um bloco da ingestão completa
+        novos = plano[dataset['dataset']]
+        linhas_bloco = tamanho_bloco * (len(estado['anos'][dataset['dataset']]) + len(novos)) // len(novos)
+        colunas = colunas_dos_anos(dataset['arquivo'], novos)
+        return le_csv_largo(dataset, tamanho_bloco=linhas_bloco, usecols=colunas)
+
+    parte, linhas = grava_parte(destino, alterados, le_blocos, pais_base, rotulo='incremental')
+    if any(linhas[nome] != estado['linhas'][nome] for nome in plano):
+        remove_partes(destino, parte)
+        return None
+
+    estado = {
+        **estado,
+        'assinatura': assinatura,
+        'arquivos': arquivos,
+        'anos': {nome: anos + plano.get(nome, []) for nome, anos in estado['anos'].items()},
+        'partes': estado['partes'] + [parte],
+    }
+    grava_estado(destino, estado)
+    return estado
+
+def atualiza_fatos(datasets, pais_base='Brasil', ano_inicial=None, tamanho_bloco=1000):
+    # Devolve a tabela fato, os cubos de cada conjunto de dados (já com os anos novos) e um
+    # dicionário dataset -> anos acrescentados (None quando o conjunto foi ingerido por completo)
+    destino = caminho_snapshot_fatos(datasets, pais_base, ano_inicial)
+    assinatura = assinatura_datasets(datasets, pais_base, ano_inicial).decode()
+    estado = le_estado(destino, datasets, pais_base, ano_inicial)
+    if estado is not None and estado['assinatura'] == assinatura:
+        return (*le_fatos(destino, estado), {})
+
+    if estado is not None:
+        arquivos = assinaturas_arquivos(datasets)
+        plano = planeja_acrescimo(estado, datasets, arquivos, ano_inicial)
+        if plano is not None:
+            estado = acrescenta_anos(destino, estado, datasets, plano, assinatura, arquivos, pais_base, tamanho_bloco)
+            if estado is not None:
+                return (*le_fatos(destino, estado), plano)
+
+    # Sem estado compatível ou com uma mudança que não é só um acréscimo de anos: ingestão completa
+    estado = ingere_datasets(datasets, destino, tamanho_bloco, pais_base, ano_inicial)
+    return (*le_fatos(destino, estado), {dataset['dataset']: None for dataset in datasets})
+
+def verifica_incremental(datasets, pais_base='Brasil', ano_inicial=None):
+    # Refaz a ingestão completa em um diretório temporário e compara a tabela e os cubos com os
+    # incrementais. Os cubos gravados também são comparados com os montados a partir da tabela
+    df_incremental, cubos_incrementais, _ = atualiza_fatos(datasets, pais_base, ano_inicial)
+    with tempfile.TemporaryDirectory() as diretorio:
+        destino = os.path.join(diretorio, 'fatos.json')
+        df_completo, cubos_completos = le_fatos(destino, ingere_datasets(datasets, destino, pais_base=pais_base,
+                                                                         ano_inicial=ano_inicial))
+
+    pd.testing.assert_frame_equal(normaliza_para_comparacao(df_incremental), normaliza_para_comparacao(df_completo))
+    for cubos in (cubos_completos, constroi_cubos(df_completo)):
+        assert list(cubos) == list(cubos_incrementais)
+        for dataset, cubo in cubos.items():
+            pd.testing.assert_frame_equal(cubo_para_comparacao(cubos_incrementais[dataset]), cubo_para_comparacao(cubo))
+    return True
+
+def normaliza_para_comparacao(df_fatos):
+    categoricas = {coluna: str for coluna in df_fatos.columns if isinstance(df_fatos[coluna].dtype, pd.CategoricalDtype)}
+    return df_fatos.astype(categoricas).sort_values(['Dataset', 'Id', 'Ano']).reset_index(drop=True)
+
+def cubo_para_comparacao(cubo):
+    return pd.concat({metrica: pd.DataFrame(cubo.medidas[metrica], index=cubo.paises, columns=cubo.anos)
+                      for metrica in METRICAS}, axis=1).sort_index()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from cubo import CuboAgregado, grava_cubos, le_cubos
+from dados import anos_do_arquivo, anos_do_cabecalho, assinatura_arquivo, colunas_a_partir_de, transforma_largo_para_longo
+from esquema import ESQUEMA_FATOS, VERSAO_ESQUEMA, categorica_constante
+from instrumentacao import etapa
+from snapshot import DIRETORIO_SNAPSHOTS, assinatura_fontes, grava_atomicamente, le_snapshot
+
+## Ingestão de vários arquivos da Embrapa em uma única tabela fato
+
+# Nomes usados pela Embrapa nos arquivos de comércio exterior (ExpVinho.csv, ImpSuco.csv, ...)
+DIRECOES = {'Exp': 'exportacao', 'Imp': 'importacao'}
+PRODUTOS = {
+    'Vinho': 'Vinhos de mesa',
+    'Vinhos': 'Vinhos de mesa',
+    'Espumantes': 'Espumantes',
+    'Uva': 'Uvas frescas',
+    'Frescas': 'Uvas frescas',
+    'Passas': 'Uvas passas',
+    'Suco': 'Suco de uva',
+}
+
+def descreve_dataset(caminho, produto=None, direcao=None):
+    # Monta a descrição de um arquivo. Produto e direção só são deduzidos do nome nos arquivos de
+    # comércio exterior (prefixo Exp/Imp); nos demais (Producao.csv, ProcessaViniferas.csv,
+    # Comercio.csv, ...) precisam ser informados, em vez de serem tratados como exportação
+    dataset = os.path.splitext(os.path.basename(caminho))[0]
+    prefixo, sufixo = dataset[:3], dataset[3:]
+    if prefixo in DIRECOES:
+        produto = produto or PRODUTOS.get(sufixo, sufixo)
+        direcao = direcao or DIRECOES[prefixo]
+    if not produto or not direcao:
+        raise ValueError(f'{caminho}: não é um arquivo de exportação (Exp...) ou importação (Imp...); '
+                         'informe o produto e a direção')
+    return {
+        'arquivo': caminho,
+        'dataset': dataset,
+        'produto': produto,
+        'direcao': direcao,
+    }
+
+def le_csv_largo(dataset, ano_inicial=None, tamanho_bloco=None, usecols=None):
+    usecols = usecols or colunas_a_partir_de(dataset['arquivo'], ano_inicial)
+    return pd.read_csv(dataset['arquivo'], sep=';', usecols=usecols, chunksize=tamanho_bloco)
+
+def hash_linhas(bloco):
+    # Hash de Id e País de cada linha: identifica as linhas do arquivo sem olhar os anos.
+    # É por linha, então o resultado não depende da divisão do arquivo em blocos
+    return pd.util.hash_pandas_object(bloco.iloc[:, :2], index=False).to_numpy().tobytes()
+
+def bloco_do_cubo(bloco):
+    # As linhas do CSV largo já são os países do cubo e os pares de colunas, os anos
+    anos = anos_do_cabecalho(bloco.columns[2:])
+    medidas = bloco.iloc[:, 2:2 + 2 * len(anos)].to_numpy(dtype=np.int64).reshape(len(bloco), len(anos), 2)
+    return bloco.iloc[:, 1].to_numpy(dtype=object), anos, {'Quantidade': medidas[:, :, 0], 'Valor': medidas[:, :, 1]}
+
+def transforma_bloco(bloco, dataset, pais_base='Brasil'):
+    # Converte um bloco de linhas do CSV largo para o formato da tabela fato
+    df_bloco = transforma_largo_para_longo(bloco, origem=pais_base)
+
+    # Na importação o país da linha é a origem e o Brasil é o destino
+    if dataset['direcao'] == 'importacao':
+        df_bloco = df_bloco.rename(columns={'Origem': 'Destino', 'Destino': 'Origem'})
+
+    df_bloco.insert(0, 'Direcao', categorica_constante(dataset['direcao'], len(df_bloco)))
+    df_bloco.insert(0, 'Produto', categorica_constante(dataset['produto'], len(df_bloco)))
+    df_bloco.insert(0, 'Dataset', categorica_constante(dataset['dataset'], len(df_bloco)))
+    return df_bloco
+
+def caminho_snapshot_fatos(datasets, pais_base='Brasil', ano_inicial=None):
+    # Um snapshot por combinação de arquivos e parâmetros (ex.: fatos-1a2b3c4d5e6f.json), para que o
+    # painel, a API e o relatório com parâmetros diferentes não sobrescrevam o snapshot um do outro.
+    # O caminho é o do estado do snapshot; as partes ficam ao lado, com o mesmo prefixo
+    diretorio = os.path.dirname(os.path.abspath(datasets[0]['arquivo']))
+    chave = json.dumps([[os.path.abspath(d['arquivo']) for d in datasets]] + parametros_ingestao(datasets, pais_base, ano_inicial))
+    return os.path.join(diretorio, DIRETORIO_SNAPSHOTS, f'fatos-{hashlib.sha1(chave.encode()).hexdigest()[:12]}.json')
+
+def parametros_ingestao(datasets, pais_base, ano_inicial):
+    return [[[d['dataset'], d['produto'], d['direcao']] for d in datasets], pais_base, ano_inicial, VERSAO_ESQUEMA]
+
+def assinatura_datasets(datasets, pais_base, ano_inicial):
+    return assinatura_fontes([d['arquivo'] for d in datasets], *parametros_ingestao(datasets, pais_base, ano_inicial))
+
+## Snapshot da tabela fato em partes
+#
+# O estado (JSON) guarda a assinatura dos arquivos, os anos e o hash das linhas de cada conjunto de
+# dados e a lista de partes. Cada parte é um arquivo Arrow com as linhas de alguns anos, gravado
+# bloco a bloco, mais um .npz com os cubos desses anos. A ingestão completa grava uma única parte;
+# a atualização incremental (incremental.py) só acrescenta partes com os anos novos
+
+def le_estado(destino, datasets, pais_base, ano_inicial):
+    # Estado do snapshot, ou None se não existe, foi gravado com outros parâmetros ou perdeu alguma parte
+    if not os.path.exists(destino):
+        return None
+    with open(destino, encoding='utf-8') as arquivo:
+        estado = json.load(arquivo)
+
+    diretorio = os.path.dirname(destino)
+    if estado.get('parametros') != json.loads(json.dumps(parametros_ingestao(datasets, pais_base, ano_inicial))):
+        return None
+    if not all(os.path.exists(os.path.join(diretorio, parte[tipo])) for parte in estado['partes'] for tipo in ('tabela', 'cubos')):
+        return None
+    return estado
+
+def grava_estado(destino, estado):
+    def grava(caminho):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(estado, arquivo, ensure_ascii=False)
+
+    grava_atomicamente(destino, grava)
+
+def assinaturas_arquivos(datasets):
+    # Assinatura de cada arquivo, no formato em que volta do JSON do estado
+    return {dataset['dataset']: list(assinatura_arquivo(dataset['arquivo'])) for dataset in datasets}
+
+def grava_parte(destino, datasets, le_blocos, pais_base='Brasil', rotulo='ingestao'):
+    # Grava uma parte nova do snapshot com os blocos do CSV largo devolvidos por le_blocos(dataset).
+    # A tabela é gravada à medida que os blocos são lidos: o pico de memória depende do tamanho do
+    # bloco, e não da quantidade de arquivos ou de anos (só os cubos, já agregados, ficam em memória)
+    prefixo = os.path.splitext(destino)[0] + '.' + uuid.uuid4().hex[:12]
+    blocos_cubos = {}
+    linhas = {}
+
+    def grava(caminho):
+        with pa.OSFile(caminho, 'wb') as arquivo, pa.ipc.new_file(arquivo, ESQUEMA_FATOS) as escritor:
+            for dataset in datasets:
+                hash_dataset = hashlib.sha1()
+                with etapa(f"{rotulo}.{dataset['dataset']}") as medicao:
+                    medicao.linhas = 0
+                    for bloco in le_blocos(dataset):
+                        hash_dataset.update(hash_linhas(bloco))
+                        if len(bloco.columns) > 2:
+                            blocos_cubos.setdefault(dataset['dataset'], []).append(bloco_do_cubo(bloco))
+                        df_bloco = transforma_bloco(bloco, dataset, pais_base=pais_base)
+                        escritor.write_batch(pa.RecordBatch.from_pandas(df_bloco, schema=ESQUEMA_FATOS, preserve_index=False))
+                        medicao.linhas += len(df_bloco)
+                linhas[dataset['dataset']] = hash_dataset.hexdigest()
+
+    def grava_cubos_parte(caminho):
+        cubos = {dataset: CuboAgregado.de_blocos(blocos) for dataset, blocos in blocos_cubos.items()}
+        grava_cubos(caminho, {dataset: (cubo.paises, cubo.anos, cubo.medidas) for dataset, cubo in cubos.items()})
+
+    grava_atomicamente(prefixo + '.feather', grava)
+    grava_atomicamente(prefixo + '.cubos.npz', grava_cubos_parte)
+    parte = {'tabela': os.path.basename(prefixo + '.feather'), 'cubos': os.path.basename(prefixo + '.cubos.npz')}
+    return parte, linhas
+
+def remove_partes(destino, parte):
+    for tipo in ('tabela', 'cubos'):
+        os.remove(os.path.join(os.path.dirname(destino), parte[tipo]))
+
+def remove_partes_antigas(destino, estado):
+    # Apaga os arquivos deste snapshot que o estado não usa mais (partes substituídas por uma
+    # ingestão completa). Um leitor que ainda tenha uma parte mapeada em memória continua lendo
+    diretorio, nome = os.path.split(destino)
+    prefixo = os.path.splitext(nome)[0] + '.'
+    usados = {nome} | {parte[tipo] for parte in estado['partes'] for tipo in ('tabela', 'cubos')}
+    for arquivo in os.listdir(diretorio):
+        if arquivo.startswith(prefixo) and arquivo not in usados and not arquivo.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(diretorio, arquivo))
+            except OSError:
+                pass
+
+def ingere_datasets(datasets, destino=None, tamanho_bloco=1000, pais_base='Brasil', ano_inicial=None):
+    # Ingestão completa: todos os anos (a partir do ano inicial) de todos os arquivos em uma única parte.
+    # As assinaturas são tiradas antes da leitura: um arquivo alterado durante a ingestão é relido depois
+    destino = destino or caminho_snapshot_fatos(datasets, pais_base, ano_inicial)
+    assinatura = assinatura_datasets(datasets, pais_base, ano_inicial).decode()
+    arquivos = assinaturas_arquivos(datasets)
+    anos = {dataset['dataset']: anos_do_arquivo(dataset['arquivo'], ano_inicial).tolist() for dataset in datasets}
+
+    parte, linhas = grava_parte(destino, datasets, lambda dataset: le_csv_largo(dataset, ano_inicial, tamanho_bloco), pais_base)
+    estado = {
+        'parametros': parametros_ingestao(datasets, pais_base, ano_inicial),
+        'assinatura': assinatura,
+        'arquivos': arquivos,
+        'anos': anos,
+        'linhas': linhas,
+        'partes': [parte],
+    }
+    grava_estado(destino, estado)
+    remove_partes_antigas(destino, estado)
+    return estado
+
+def le_fatos(destino, estado):
+    # Tabela fato (todas as partes, via memory-map) e os cubos de cada conjunto de dados, somando
+    # os anos de cada parte
+    diretorio = os.path.dirname(destino)
+    df_fatos = le_snapshot([os.path.join(diretorio, parte['tabela']) for parte in estado['partes']])
+
+    with etapa('leitura_cubos'):
+        blocos = {}
+        for parte in estado['partes']:
+            for dataset, bloco in le_cubos(os.path.join(diretorio, parte['cubos'])).items():
+                blocos.setdefault(dataset, []).append(bloco)
+        cubos = {dataset: CuboAgregado.de_blocos(blocos[dataset]) for dataset in estado['anos'] if dataset in blocos}
+    return df_fatos, cubos
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+## Instrumentação opcional das etapas do pipeline
+#
+# Ativada com INSTRUMENTACAO=1. Cada etapa registra tempo de relógio, tempo de CPU da thread,
+# pico de memória alocada (tracemalloc) e quantidade de linhas, e emite uma linha de log em JSON.
+# Desativada, etapa() devolve sempre o mesmo objeto nulo, sem medir nada.
+#
+# Tempos e linhas são da thread da etapa. O pico de memória não: o tracemalloc mede o processo
+# inteiro, e reset_peak() zera o pico de todas as threads. Por isso o campo se chama
+# memoria_pico_processo_bytes e só é confiável com uma única sessão (ou execução) por vez
+
+ATIVA = os.environ.get('INSTRUMENTACAO', '') not in ('', '0')
+
+logger = logging.getLogger('instrumentacao')
+
+def configura_log(stream=None):
+    # As linhas são emitidas em INFO, mas o Streamlit não configura o logging (a raiz fica em WARNING,
+    # sem handler). Com a instrumentação ativa o logger ganha o próprio handler (stderr por padrão)
+    # e não repassa as linhas à raiz, para não duplicá-las quando a raiz também tem handler (api.py)
+    if not logger.handlers:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+if ATIVA:
+    configura_log()
+
+# O Streamlit executa o script de cada sessão em uma thread própria: os registros e a
+# pilha de etapas aninhadas ficam separados por thread (o pico de memória, não; ver acima).
+# Um lock em volta das etapas não resolveria: uma sessão esperando o cache do Streamlit,
+# que outra sessão está calculando dentro de uma etapa, travaria as duas
+_local = threading.local()
+
+def _estado():
+    if not hasattr(_local, 'registros'):
+        _local.registros = []
+        _local.pilha = []
+    return _local
+
+class _EtapaNula:
+    linhas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+_ETAPA_NULA = _EtapaNula()
+
+class _Etapa:
+
+    def __init__(self, nome, linhas=None):
+        self.nome = nome
+        self.linhas = linhas
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        # O pico do tracemalloc é global (do processo): antes de zerá-lo, repassa o pico atual à etapa externa
+        estado = _estado()
+        atual, pico = tracemalloc.get_traced_memory()
+        if estado.pilha:
+            estado.pilha[-1].pico = max(estado.pilha[-1].pico, pico)
+        tracemalloc.reset_peak()
+
+        self.memoria_inicial = self.pico = atual
+        estado.pilha.append(self)
+        self.cpu_inicial = time.thread_time()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        segundos = time.perf_counter() - self.inicio
+        cpu_segundos = time.thread_time() - self.cpu_inicial
+        self.pico = max(self.pico, tracemalloc.get_traced_memory()[1])
+
+        estado = _estado()
+        estado.pilha.pop()
+        if estado.pilha:
+            estado.pilha[-1].pico = max(estado.pilha[-1].pico, self.pico)
+
+        registro = {
+            'etapa': self.nome,
+            'segundos': round(segundos, 6),
+            'cpu_segundos': round(cpu_segundos, 6),
+            'memoria_pico_processo_bytes': self.pico - self.memoria_inicial,
+            'linhas': None if self.linhas is None else int(self.linhas),
+            'nivel': len(estado.pilha),
+        }
+        estado.registros.append(registro)
+        logger.info(json.dumps(registro, ensure_ascii=False))
+        return False
+
+def etapa(nome, linhas=None):
+    # Uso: with etapa('leitura_csv') as medicao: ...; medicao.linhas = len(df)
+    if not ATIVA:
+        return _ETAPA_NULA
+    return _Etapa(nome, linhas)
+
+def coleta():
+    # Devolve e limpa os registros da thread atual
+    estado = _estado()
+    registros, estado.registros = estado.registros, []
+    return registros
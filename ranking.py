@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+## Ranking paginado dos destinos, ordenado no servidor
+
+METRICAS_RANKING = ['Valor', 'Quantidade']
+
+class RankingDestinos:
+    # Guarda a tabela agrupada por destino em arrays numéricos, com a ordem (argsort) de cada
+    # métrica já calculada. Ordenar, filtrar e paginar só percorre arrays de inteiros, e apenas
+    # as linhas da página pedida viram um dataframe
+
+    def __init__(self, df_agrupado):
+        self.colunas = list(df_agrupado.columns)
+        self.colunas_texto = [coluna for coluna in df_agrupado.columns if coluna not in METRICAS_RANKING]
+        self._codigos = {}
+        self._categorias = {}
+        for coluna in self.colunas_texto:
+            codigos, categorias = pd.factorize(df_agrupado[coluna])
+            self._codigos[coluna] = codigos
+            self._categorias[coluna] = np.asarray(categorias, dtype=object)
+        self.medidas = {metrica: df_agrupado[metrica].to_numpy(dtype=np.int64) for metrica in METRICAS_RANKING}
+
+        # Ordem decrescente por métrica, com a outra métrica como critério de desempate
+        # (a mesma ordem de agrupa_por_destino quando a métrica é Valor)
+        self._ordens = {metrica: np.lexsort((-self.medidas[desempate], -self.medidas[metrica]))
+                        for metrica, desempate in zip(METRICAS_RANKING, METRICAS_RANKING[::-1])}
+
+        # País parceiro de cada linha, usado na busca: o destino nas exportações e a origem nas
+        # importações (em que o destino é sempre o Brasil)
+        parceiros = self._nomes('Destino')
+        if 'Direcao' in self._codigos and 'Origem' in self._codigos:
+            parceiros = np.where(self._nomes('Direcao') == 'importacao', self._nomes('Origem'), parceiros)
+        self._codigos_parceiro, nomes_parceiro = pd.factorize(parceiros)
+        self._nomes_parceiro = np.asarray(nomes_parceiro, dtype=object)
+
+    def __len__(self):
+        return len(self.medidas['Valor'])
+
+    def _nomes(self, coluna, linhas=slice(None)):
+        return self._categorias[coluna][self._codigos[coluna][linhas]]
+
+    def valores(self, coluna):
+        # Valores distintos de uma coluna de texto (ex.: para montar um filtro por produto)
+        return sorted(self._categorias[coluna])
+
+    def filtra(self, busca=None, filtros=None):
+        # Máscara das linhas que atendem à busca (trecho do nome do país parceiro, sem diferenciar
+        # maiúsculas) e aos filtros coluna -> valor. As comparações são feitas nos nomes
+        # distintos de cada coluna e levadas às linhas pelos códigos
+        mascara = np.ones(len(self), dtype=bool)
+        if busca:
+            encontrados = np.array([busca.casefold() in str(nome).casefold() for nome in self._nomes_parceiro], dtype=bool)
+            mascara &= encontrados[self._codigos_parceiro]
+        for coluna, valor in (filtros or {}).items():
+            mascara &= (self._categorias[coluna] == valor)[self._codigos[coluna]]
+        return mascara
+
+    def linhas(self, metrica='Valor', decrescente=True, busca=None, filtros=None):
+        # Índices das linhas filtradas, na ordem pedida
+        ordem = self._ordens[metrica] if decrescente else self._ordens[metrica][::-1]
+        if busca or filtros:
+            ordem = ordem[self.filtra(busca, filtros)[ordem]]
+        return ordem
+
+    def pagina(self, pagina=1, tamanho=25, metrica='Valor', decrescente=True, busca=None, filtros=None):
+        # Devolve o dataframe da página (numérico, com a posição de cada linha no ranking
+        # decrescente da métrica entre as linhas filtradas), o total de linhas filtradas e o total de páginas
+        ordem = self.linhas(metrica, decrescente, busca, filtros)
+        paginas = max(1, math.ceil(len(ordem) / tamanho))
+        pagina = min(max(1, pagina), paginas)
+        inicio = (pagina - 1) * tamanho
+        selecionadas = ordem[inicio:inicio + tamanho]
+
+        indices = np.arange(inicio, inicio + len(selecionadas))
+        df_pagina = pd.DataFrame({'Posição': indices + 1 if decrescente else len(ordem) - indices})
+        for coluna in self.colunas:
+            if coluna in self.medidas:
+                df_pagina[coluna] = self.medidas[coluna][selecionadas]
+            else:
+                df_pagina[coluna] = self._nomes(coluna, selecionadas)
+        return df_pagina, len(ordem), paginas
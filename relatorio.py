@@ -0,0 +1,139 @@
+import argparse
+import html
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+
+from graficos import plota_grafico_pais_valor_ano_linha, plota_top10_importadores, plota_total_por_ano, renderiza_figura
+from incremental import atualiza_fatos
+from ingestao import descreve_dataset
+
+## Gerador do relatório estático (HTML + PNG), sem Streamlit
+#
+# Uso: python relatorio.py --csv ExpVinho.csv --saida relatorio --processos 8
+
+def nome_arquivo(texto):
+    # 'Arábia Saudita' -> 'arabia-saudita'
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-')
+
+# Unidade da coluna Quantidade em cada produto da Embrapa (os demais são em litros)
+UNIDADES = {'Uvas frescas': 'quilos', 'Uvas passas': 'quilos'}
+
+def textos_do_relatorio(dataset, df_por_ano):
+    # Títulos dos gráficos e da página de acordo com a direção, o produto e o período do conjunto de dados
+    produto = dataset['produto'].lower()
+    if dataset['direcao'] == 'importacao':
+        operacao, parceiros, pais = 'importações', 'origens', 'das importações de {produto} vindas de {{pais}}'
+    elif dataset['direcao'] == 'exportacao':
+        operacao, parceiros, pais = 'exportações', 'destinos', 'das exportações de {produto} para {{pais}}'
+    else:
+        raise ValueError(f"{dataset['dataset']}: o relatório cobre apenas exportação e importação (direção {dataset['direcao']})")
+    periodo = f"{df_por_ano['Ano'].min()} a {df_por_ano['Ano'].max()}" if len(df_por_ano) else 'sem dados'
+    return {
+        'operacao': operacao,
+        'periodo': periodo,
+        'unidade': UNIDADES.get(dataset['produto'], 'litros'),
+        'pais': pais.format(produto=produto),
+        'total': f'{operacao} de {produto}',
+        'top10': f'Top 10 {parceiros} das {operacao} de {produto} em dólares (US$)',
+        'pagina': f'Análise das {operacao} de {produto} ({periodo})',
+    }
+
+def tarefas_do_relatorio(cubo, ano_inicial, dataset):
+    # Lista de (caminho relativo, tipo do gráfico, parâmetros, opções) com todos os gráficos do relatório
+    df_por_ano = cubo.totais_por_ano(ano_inicial=ano_inicial)
+    textos = textos_do_relatorio(dataset, df_por_ano)
+    tarefas = [
+        ('total_quantidade.png', 'total_por_ano', (df_por_ano, 'Quantidade', 'purple',
+                                                   f"Total em quantidade ({textos['unidade']}) das {textos['total']}",
+                                                   f"Quantidade em milhões de {textos['unidade']}"), {}),
+        ('total_valor.png', 'total_por_ano', (df_por_ano, 'Valor', 'green',
+                                              f"Total em dólares (US$) das {textos['total']}",
+                                              'Valor em milhões de dólares'), {}),
+        ('top10.png', 'top10', (cubo.top(10, 'Valor', ano_inicial=ano_inicial),),
+         {'titulo': textos['top10'], 'periodo': textos['periodo']}),
+    ]
+
+    # Um gráfico por país, para todos os países com algum valor no período (ordenados por valor)
+    df_paises = cubo.top(None, 'Valor', ano_inicial=ano_inicial)
+    for pais in df_paises.loc[df_paises['Valor'] > 0, 'Destino']:
+        data = cubo.serie_df(pais, ano_inicial=ano_inicial)
+        divisor = 1_000_000 if data['Valor'].max() >= 1_000_000 else 1
+        tarefas.append((os.path.join('paises', nome_arquivo(pais) + '.png'), 'pais', (data, 'purple', pais, divisor),
+                        {'descricao': textos['pais']}))
+    return tarefas, textos
+
+TAMANHOS = {'total_por_ano': (6, 3), 'top10': (12, 6), 'pais': (6, 3.2)}
+
+def renderiza_tarefa(diretorio, tarefa):
+    # Executada nos processos do pool: desenha o gráfico com o backend Agg e grava o PNG
+    caminho, tipo, parametros, opcoes = tarefa
+    funcoes = {'total_por_ano': plota_total_por_ano, 'top10': plota_top10_importadores, 'pais': plota_grafico_pais_valor_ano_linha}
+    imagem = renderiza_figura(TAMANHOS[tipo], lambda ax: funcoes[tipo](*parametros, ax=ax, **opcoes), dpi=120)
+
+    destino = os.path.join(diretorio, caminho)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with open(destino, 'wb') as arquivo:
+        arquivo.write(imagem)
+    return caminho
+
+def escreve_html(diretorio, tarefas, textos):
+    titulo = textos['pagina']
+    gerais = [caminho for caminho, tipo, _, _ in tarefas if tipo != 'pais']
+    paises = [(parametros[2], caminho) for caminho, tipo, parametros, _ in tarefas if tipo == 'pais']
+
+    linhas = [
+        '<!DOCTYPE html>',
+        '<html lang="pt-BR"><head><meta charset="utf-8">',
+        f'<title>{html.escape(titulo)}</title>',
+        '<style>body{font-family:sans-serif;margin:2em}img{max-width:100%}'
+        '.grade{display:grid;grid-template-columns:repeat(auto-fill,minmax(480px,1fr));gap:1em}</style>',
+        '</head><body>',
+        f'<h1>{html.escape(titulo)}</h1>',
+    ]
+    linhas += [f'<p><img src="{caminho}" alt="{caminho}"></p>' for caminho in gerais]
+    linhas.append(f"<h2>{textos['operacao'].capitalize()} por país ({len(paises)} países)</h2><div class=\"grade\">")
+    linhas += [f'<figure><img src="{caminho.replace(os.sep, "/")}" alt="{html.escape(pais)}" loading="lazy"></figure>'
+               for pais, caminho in paises]
+    linhas.append('</div></body></html>')
+
+    with open(os.path.join(diretorio, 'index.html'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas))
+
+def gera_relatorio(caminhos_csv, diretorio, dataset=None, ano_inicial=2009, processos=None):
+    datasets = [descreve_dataset(caminho) for caminho in caminhos_csv]
+    escolhido = {d['dataset']: d for d in datasets}[dataset or datasets[0]['dataset']]
+    # O relatório só usa os cubos, que já vêm prontos com o snapshot
+    _, cubos, _ = atualiza_fatos(datasets, ano_inicial=ano_inicial)
+    cubo = cubos[escolhido['dataset']]
+
+    tarefas, textos = tarefas_do_relatorio(cubo, ano_inicial, escolhido)
+    os.makedirs(diretorio, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        list(executor.map(renderiza_tarefa, [diretorio] * len(tarefas), tarefas, chunksize=8))
+
+    escreve_html(diretorio, tarefas, textos)
+    return len(tarefas)
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o relatório estático (HTML + PNG) com todos os gráficos.')
+    parser.add_argument('--csv', nargs='+', default=['ExpVinho.csv'], help='arquivos CSV da Embrapa')
+    parser.add_argument('--dataset', default=None, help='conjunto de dados do relatório (padrão: o primeiro CSV)')
+    parser.add_argument('--saida', default='relatorio', help='diretório de saída')
+    parser.add_argument('--ano-inicial', type=int, default=2009)
+    parser.add_argument('--processos', type=int, default=None, help='processos de renderização (padrão: núcleos da CPU)')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    total = gera_relatorio(args.csv, args.saida, args.dataset, args.ano_inicial, args.processos)
+    print(f'{total} gráficos gerados em {args.saida}/ em {time.perf_counter() - inicio:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from dados import assinatura_arquivo
+from instrumentacao import etapa
+
+## Snapshots colunares (Arrow/Feather): assinatura, gravação atômica e leitura via memory-map
+
+DIRETORIO_SNAPSHOTS = '.snapshots'
+
+def assinatura_fontes(caminhos, *parametros):
+    # Assinatura (data de modificação e tamanho) de todos os arquivos de origem, mais os
+    # parâmetros da geração, gravada no estado do snapshot
+    return json.dumps([assinatura_arquivo(caminho) for caminho in caminhos] + list(parametros)).encode()
+
+def grava_atomicamente(destino, grava):
+    # Grava em um arquivo temporário e renomeia, para que um leitor nunca veja um snapshot pela metade.
+    # O nome temporário é único, então processos gravando ao mesmo tempo (painel e API) não colidem
+    diretorio = os.path.dirname(destino)
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=os.path.basename(destino) + '.', suffix='.tmp')
+    os.close(descritor)
+    try:
+        grava(temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.remove(temporario)
+        raise
+    return destino
+
+def le_snapshot(caminhos):
+    # Leitura via memory-map das partes de uma tabela (arquivos com o mesmo esquema), na ordem
+    # informada; colunas de texto voltam como categóricas
+    with etapa('leitura_snapshot') as medicao:
+        tabela = pa.concat_tables([feather.read_table(caminho, memory_map=True) for caminho in caminhos])
+        df = tabela.to_pandas(strings_to_categorical=True)
+        medicao.linhas = len(df)
+    return df
@@ -1,135 +1,94 @@
-import pandas as pd
+import os
+
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+from cache import CacheLRU
+from crescimento import mercados_em_crescimento
+from dados import assinatura_arquivo, deriva_tabelas
+from formatacao import formata_numero, formata_numeros, formata_valor, formata_valores
+from graficos import (impressao_digital, plota_grafico_pais_valor_ano_linha,
+                      plota_top10_importadores, plota_total_por_ano, renderiza_figura,
+                      vega_grafico_pais_valor_ano_linha, vega_top10_importadores, vega_total_por_ano)
+from incremental import atualiza_fatos
+from ingestao import descreve_dataset
+from instrumentacao import ATIVA as INSTRUMENTACAO_ATIVA, coleta, etapa
+from ranking import METRICAS_RANKING
 
 st.set_page_config(layout = 'wide')
 
 ## Funções
 
-def formata_valor(valor):
-    return f'US$ {round(valor,2):,.2f}'.replace(',', 'v').replace('.', ',').replace('v', '.')
-
-def formata_numero(numero):
-    return "{:,}".format(numero).replace(',', '.')
-
-# Função para verificar se a Quantidade é crescente dentro de cada grupo
-def is_increasing(group):
-    return group['Quantidade'].is_monotonic_increasing
+# O cache de figuras é compartilhado entre as sessões: cada gráfico é renderizado uma vez
+# e as visualizações seguintes recebem diretamente os bytes da imagem
+@st.cache_resource
+def obtem_cache_figuras():
+    return CacheLRU(maximo=64)
 
-def plota_grafico_pais_valor_ano_linha(data, cor, pais, divisor=1):
-    sns.lineplot(x=data['Ano'], y=data['Valor']/divisor, data=data, marker='o', lw=3, color=cor)
-    # Adiciona título
-    if divisor == 1:
-        ax.set_title(f'Total em dólares (US$) de vinhos importados pelo(a) {pais}', loc='left', fontsize=12)
-    elif divisor == 1_000_000:
-        ax.set_title(f'Total em milhões de dólares (US$) de vinhos importados pelo(a) {pais}', loc='left', fontsize=12)
+# Backend dos gráficos: 'matplotlib' (imagem renderizada no servidor) ou 'vega' (o servidor envia
+# apenas os pontos agregados e o navegador desenha o gráfico). Ex.: BACKEND_GRAFICOS=vega streamlit run ...
+BACKEND_GRAFICOS = os.environ.get('BACKEND_GRAFICOS', 'matplotlib')
 
-    # Configurações adicionais do gráfico
-    ax.set_xlabel('', fontsize=10)
-    ax.set_ylabel('Valor em dólares', fontsize=10)
-    ax.set_xticks(data['Ano'])
+def mostra_grafico(chave, figsize, desenha, vega):
+    with etapa('grafico.' + '.'.join(str(parte) for parte in chave[:2])):
+        if BACKEND_GRAFICOS == 'vega':
+            pontos, especificacao = vega()
+            st.vega_lite_chart(pontos, especificacao, width='stretch')
+            return
 
-    # Ajusta o tamanho da fonte dos ticks
-    ax.tick_params(axis='x', labelsize=8)  # Tamanho da fonte dos ticks do eixo x
-    ax.tick_params(axis='y', labelsize=8)  # Tamanho da fonte dos ticks do eixo y
-    plt.xticks(rotation=45)
+        imagem = obtem_cache_figuras().obtem((chave, figsize), lambda: renderiza_figura(figsize, desenha))
+        st.image(imagem, width='stretch')
 
-    sns.despine()
-    ax.grid(True, linestyle='--') 
+def mostra_grafico_pais(data, cor, pais, figsize, divisor=1):
+    chave = ('pais', pais, 'Valor', divisor, cor, impressao_digital(data))
+    mostra_grafico(chave, figsize, lambda ax: plota_grafico_pais_valor_ano_linha(data, cor, pais, divisor, ax=ax),
+                   lambda: vega_grafico_pais_valor_ano_linha(data, cor, pais, divisor, altura=int(figsize[1] * 70)))
 
 ## Manipulação e criação do dataframe
 
-df = pd.read_csv('ExpVinho.csv',sep=';')
-
-# Criando uma lista de anos duplicados
-anos = [str(ano) for ano in range(1970, 2024)]
-
-# Inicializando listas para armazenar os resultados
-ids = []
-paises = []
-anos_list = []
-quantidades = []
-valores = []
-
-# Iterando sobre cada linha do DataFrame
-for i, row in df.iterrows():
-    id_pais = row[:2]
-    for ano_index in range(len(anos)):
-        ids.append(id_pais[0])
-        paises.append(id_pais[1])
-        anos_list.append(anos[ano_index])
-        quantidades.append(row[2 + 2 * ano_index])
-        valores.append(row[2 + 2 * ano_index + 1])
-
-# Criando o DataFrame resultante
-df_resultado = pd.DataFrame({
-    'Id': ids,
-    'País': paises,
-    'Ano': anos_list,
-    'Quantidade': quantidades,
-    'Valor': valores
-})
-
-# Convertendo a coluna 'Ano' de string para inteiro
-df_resultado['Ano'] = df_resultado['Ano'].astype(int)
-
-#adicionando a coluna Brasil
-df_resultado['Pais Origem'] = 'Brasil'
-
-#reordenando as colunas
-# Reordenando as colunas
-new_order = ['Id', 'Pais Origem', 'País', 'Ano', 'Quantidade', 'Valor']
-df_resultado = df_resultado[new_order]
-
-df_resultado.columns = ['Id', 'Origem', 'Destino', 'Ano', 'Quantidade', 'Valor']
-
-#filtrando apenas a partir do ano 2009
-df_resultado = df_resultado.query('Ano >= 2009')
-
-df_resultado_agrupado_destino = df_resultado.groupby(by=['Origem','Destino']).sum(['Quantidade','Valor']).reset_index()
+# Arquivos da Embrapa carregados na tabela fato. Outros arquivos no mesmo layout
+# (ImpVinhos.csv, ExpSuco.csv, ...) podem ser adicionados a esta lista
+ARQUIVOS_CSV = ['ExpVinho.csv']
 
-df_resultado_agrupado_destino.drop(['Ano','Id'],axis=1,inplace=True)
+# Conjunto de dados analisado na página e primeiro ano considerado
+DATASET_PRINCIPAL = 'ExpVinho'
+ANO_INICIAL = 2009
 
-#ordenar por Quantidade e Valor
-df_resultado_agrupado_destino = df_resultado_agrupado_destino.sort_values(by=['Valor','Quantidade'], ascending=False).reset_index(drop=True)
+# Os agregados são calculados uma única vez e compartilhados entre todas as sessões: o
+# cache_resource devolve os mesmos objetos a cada execução, sem copiá-los (o cache_data
+# serializaria e desserializaria tudo a cada execução). deriva_tabelas devolve apenas os
+# objetos que a página usa (cubos, ranking e crescimento), e a página nunca os altera (só lê e cria dataframes novos).
+# A assinatura dos arquivos (caminho, data de modificação e tamanho) faz parte da chave
+# do cache, então uma alteração em qualquer CSV gera um novo processamento automaticamente.
+# A tabela fato e os cubos vêm do snapshot colunar: quando um ano é acrescentado a um CSV, apenas
+# as colunas desse ano são lidas, e os anos anteriores a ANO_INICIAL nunca são carregados
+@st.cache_resource(show_spinner=False, max_entries=2)
+def carrega_dados(caminhos, assinaturas):
+    datasets = [descreve_dataset(caminho) for caminho in caminhos]
+    df_fatos, cubos, _ = atualiza_fatos(datasets, ano_inicial=ANO_INICIAL)
+    return deriva_tabelas(df_fatos, ano_inicial=ANO_INICIAL, cubos=cubos)
 
-#agrupamento por ano
-df_exp_por_ano = df_resultado.groupby('Ano').sum(['Quantidade', 'Valor'])
-df_exp_por_ano = df_exp_por_ano.drop('Id', axis=1)
-df_exp_por_ano = df_exp_por_ano.reset_index()
+with etapa('carrega_dados'):
+    dados = carrega_dados(ARQUIVOS_CSV, [assinatura_arquivo(caminho) for caminho in ARQUIVOS_CSV])
 
-#dataframe criado para analisar os países em crescimento
-df_resultado_analise_crescimento = df_resultado.copy()
+ranking_destino = dados['ranking_destino']
+cubo = dados['cubos'][DATASET_PRINCIPAL]
 
-# manter no dataframe apenas os paises nos quais a quantidade de exportação segue sempre em crescimento
-# Função para verificar se a Quantidade é crescente dentro de cada grupo
-# Agrupar por Destino e aplicar a função de verificação
-df_resultado_analise_crescimento_apos_filtro = df_resultado_analise_crescimento.groupby('Destino').filter(is_increasing)
-df_analise_crescimento = df_resultado_analise_crescimento_apos_filtro.query('Destino != "Brasil"')
-# Agrupar por Destino e calcular o somatório de Quantidade para cada grupo
-quantity_sum = df_analise_crescimento.groupby('Destino')['Quantidade'].sum()
+# Totais por ano a partir de 2009, lidos do cubo pré-agregado
+df_exp_por_ano = cubo.totais_por_ano(ano_inicial=ANO_INICIAL)
 
-# Filtrar os Destinos cujo somatório de Quantidade é >= 100
-valid_destinos = quantity_sum[quantity_sum >= 100].index
+# Montando os dataframes dos 3 países que apresentam crescimento contínuo (ver crescimento.py)
 
-# Manter apenas as linhas do dataframe original com os Destinos válidos
-df_analise_crescimento = df_analise_crescimento[df_analise_crescimento['Destino'].isin(valid_destinos)]
-df_analise_crescimento = df_analise_crescimento.query('Ano >= 2018')
-
-# Montando os dataframes dos 3 países que apresentam crescimento acima de 100 dólares
-
-df_arabia_saudita = df_analise_crescimento.query('Destino == "Arábia Saudita"')
-df_liberia = df_analise_crescimento.query('Destino == "Libéria"')
-df_malavi = df_analise_crescimento.query('Destino == "Malavi"')
+df_arabia_saudita = cubo.serie_df('Arábia Saudita', ano_inicial=2018)
+df_liberia = cubo.serie_df('Libéria', ano_inicial=2018)
+df_malavi = cubo.serie_df('Malavi', ano_inicial=2018)
 
 # Montando os dataframes dos top-6 importadores
-df_paraguai = df_resultado.query('Destino == "Paraguai"')
-df_russia = df_resultado.query('Destino == "Rússia"')
-df_estados_unidos = df_resultado.query('Destino == "Estados Unidos"')
-df_china = df_resultado.query('Destino == "China"')
-df_reino_unido = df_resultado.query('Destino == "Reino Unido"')
-df_espanha = df_resultado.query('Destino == "Espanha"')
+df_paraguai = cubo.serie_df('Paraguai', ano_inicial=ANO_INICIAL)
+df_russia = cubo.serie_df('Rússia', ano_inicial=ANO_INICIAL)
+df_estados_unidos = cubo.serie_df('Estados Unidos', ano_inicial=ANO_INICIAL)
+df_china = cubo.serie_df('China', ano_inicial=ANO_INICIAL)
+df_reino_unido = cubo.serie_df('Reino Unido', ano_inicial=ANO_INICIAL)
+df_espanha = cubo.serie_df('Espanha', ano_inicial=ANO_INICIAL)
 
 ## Front-end
 
@@ -147,11 +106,38 @@ Segue abaixo a tabela contendo as informações de país de origem, país de des
 """)
 
 
-df_formatado = df_resultado_agrupado_destino.copy()
-df_formatado['Valor'] = df_formatado['Valor'].map(formata_valor)
-df_formatado['Quantidade'] = df_formatado['Quantidade'].map(formata_numero)
-
-st.dataframe(df_formatado, width=1250)
+# Tabela paginada: a ordenação e os filtros são aplicados no servidor, sobre os valores numéricos,
+# e apenas as linhas da página atual são formatadas e enviadas ao navegador
+coluna1, coluna2, coluna3, coluna4 = st.columns([1, 1, 2, 1])
+with coluna1:
+    metrica_ranking = st.selectbox('Ordenar por', METRICAS_RANKING, key='ranking_metrica')
+with coluna2:
+    ordem_ranking = st.selectbox('Ordem', ['Decrescente', 'Crescente'], key='ranking_ordem')
+with coluna3:
+    busca_ranking = st.text_input('Buscar país parceiro', key='ranking_busca', help='Destino nas exportações, origem nas importações')
+with coluna4:
+    tamanho_pagina = st.selectbox('Linhas por página', [10, 25, 50, 100], index=1, key='ranking_tamanho')
+
+# Com vários conjuntos de dados na tabela fato, também é possível filtrar por produto e direção
+filtros_ranking = {}
+for coluna in ['Produto', 'Direcao']:
+    if coluna in ranking_destino.colunas and len(ranking_destino.valores(coluna)) > 1:
+        filtros_ranking[coluna] = st.selectbox(coluna, ranking_destino.valores(coluna), key=f'ranking_{coluna.lower()}')
+
+# A página é montada com a página guardada na sessão (pagina já a limita ao total do filtro atual),
+# e o valor limitado volta para a sessão antes de criar o campo: o filtro e a ordenação rodam uma vez só
+df_pagina, total_ranking, paginas_ranking = ranking_destino.pagina(st.session_state.get('ranking_pagina', 1), tamanho_pagina,
+                                                                   metrica_ranking, ordem_ranking == 'Decrescente',
+                                                                   busca_ranking, filtros_ranking)
+st.session_state['ranking_pagina'] = min(max(1, st.session_state.get('ranking_pagina', 1)), paginas_ranking)
+pagina_ranking = st.number_input(f'Página (de {paginas_ranking})', min_value=1, max_value=paginas_ranking, step=1, key='ranking_pagina')
+
+df_pagina['Valor'] = formata_valores(df_pagina['Valor'])
+df_pagina['Quantidade'] = formata_numeros(df_pagina['Quantidade'])
+
+st.dataframe(df_pagina, width=1250, hide_index=True)
+inicio_pagina = (pagina_ranking - 1) * tamanho_pagina
+st.caption(f'Exibindo {min(inicio_pagina + 1, total_ranking)} a {min(inicio_pagina + tamanho_pagina, total_ranking)} de {total_ranking} destinos')
 
 st.write("""
 A análise inicial aborda o volume total de litros de vinho exportados anualmente nos últimos 15 anos, oferecendo uma visão detalhada das tendências ao longo do tempo nessa variável específica.
@@ -163,29 +149,13 @@ Segundo o gráfico 'Total em quantidade (litros) de vinhos exportados' abaixo, o
 Isso demonstra a importância de estabelecer parcerias estratégicas e atuar junto ao Governo Federal para a criação de políticas econômicas favoráveis ao setor, destacando como a colaboração entre o setor público e privado pode resultar em benefícios significativos para a Vinícola.
 """)
 
-fig, ax = plt.subplots(figsize=(6, 3))
-
-sns.lineplot(x=df_exp_por_ano['Ano'], y=df_exp_por_ano['Quantidade']/1000000, data=df_exp_por_ano, marker='o', lw=3, color='purple')
-
-# Adiciona título
-ax.set_title('Total em quantidade (litros) de vinhos exportados', loc='left', fontsize=12)
-
-# Configurações adicionais do gráfico
-ax.set_xlabel('', fontsize=10)
-ax.set_ylabel('Quantidade em milhões de litros', fontsize=10)
-ax.set_xticks(df_exp_por_ano['Ano'])
-ax.set_ylim(0, 30)
-
-# Ajusta o tamanho da fonte dos ticks
-ax.tick_params(axis='x', labelsize=8)  # Tamanho da fonte dos ticks do eixo x
-ax.tick_params(axis='y', labelsize=8)  # Tamanho da fonte dos ticks do eixo y
-plt.xticks(rotation=45)
-
-sns.despine()
-ax.grid(True, linestyle='--') 
-
-# Mostrando o gráfico no Streamlit
-st.pyplot(fig)
+mostra_grafico(('total_por_ano', 'Quantidade', 1000000, impressao_digital(df_exp_por_ano)), (6, 3),
+               lambda ax: plota_total_por_ano(df_exp_por_ano, 'Quantidade', 'purple',
+                                              'Total em quantidade (litros) de vinhos exportados',
+                                              'Quantidade em milhões de litros', 30, ax=ax),
+               lambda: vega_total_por_ano(df_exp_por_ano, 'Quantidade', 'purple',
+                                          'Total em quantidade (litros) de vinhos exportados',
+                                          'Quantidade em milhões de litros', 30))
 
 st.write("""
 Além disso, no gráfico 'Total em dólares (US$) de vinhos exportados', abaixo apresentado, verificamos em 2013 um recorde do valor das exportações em dólares de mais de 22,5 milhões de dólares, um aumento de mais de quatro vezes o valor de exportação no ano anterior.
@@ -195,65 +165,23 @@ Uma das justificativas desse recorde é o foco na construção da imagem da marc
 Isso nos leva a concluir a importância do investimento em marketing e promoção, na participação em feiras e eventos, no estabelecimento de parcerias e representantes locais nos países-alvos, e na garantia de uma infraestrutura logística eficiente e confiável.
 """)
 
-fig, ax = plt.subplots(figsize=(6, 3.08))
-
-sns.lineplot(x=df_exp_por_ano['Ano'], y=df_exp_por_ano['Valor']/1000000, data=df_exp_por_ano, marker='o', lw=3, color='green')
-
-# Adiciona título
-ax.set_title('Total em dólares (US$) de vinhos exportados', loc='left', fontsize=12)
-
-# Configurações adicionais do gráfico
-ax.set_xlabel('', fontsize=10)
-ax.set_ylabel('Valor em milhões de dólares', fontsize=10)
-ax.set_xticks(df_exp_por_ano['Ano'])
-ax.set_ylim(0, 25)
-
-# Ajusta o tamanho da fonte dos ticks
-ax.tick_params(axis='x', labelsize=8)  # Tamanho da fonte dos ticks do eixo x
-ax.tick_params(axis='y', labelsize=8)  # Tamanho da fonte dos ticks do eixo y
-plt.xticks(rotation=45)
-
-sns.despine()
-ax.grid(True, linestyle='--') 
-
-# Mostrando o gráfico no Streamlit
-st.pyplot(fig)
+mostra_grafico(('total_por_ano', 'Valor', 1000000, impressao_digital(df_exp_por_ano)), (6, 3.08),
+               lambda ax: plota_total_por_ano(df_exp_por_ano, 'Valor', 'green',
+                                              'Total em dólares (US$) de vinhos exportados',
+                                              'Valor em milhões de dólares', 25, ax=ax),
+               lambda: vega_total_por_ano(df_exp_por_ano, 'Valor', 'green',
+                                          'Total em dólares (US$) de vinhos exportados',
+                                          'Valor em milhões de dólares', 25))
 
 st.write("""
 Prosseguindo com a análise, o gráfico abaixo apresenta os 10 maiores exportadores de vinho da Vinícola em termos de valor em dólares (US$) de 2009 à 2023:
 """)
 
-# Gráfico de barras do top 10 importadores   
-
-fig, ax = plt.subplots(figsize=(12, 6))
-
-sns.barplot(x=df_resultado_agrupado_destino['Valor'].head(10) / 1000000,
-            y=df_resultado_agrupado_destino['Destino'].head(10),
-            data=df_resultado_agrupado_destino, orient='h',
-            hue=df_resultado_agrupado_destino['Destino'].head(10),
-            palette='viridis')
-
-# Configurações adicionais do gráfico
-ax.set_xlabel('', fontsize=18)
-ax.set_ylabel('', fontsize=18)
-ax.set_xlim(0, 55)
-
-# Ajusta o tamanho da fonte dos ticks
-ax.tick_params(bottom=False, labelbottom=False)
-ax.tick_params(axis='y', labelsize=14)  # Tamanho da fonte dos ticks do eixo y
-
-# Adiciona título
-ax.set_title('Top 10 maiores importadores de vinho em dólares (US$)\n2009 à 2023', loc='left', fontsize=20)
-
-# Adicionar os valores no final das barras
-for index, value in enumerate(df_resultado_agrupado_destino['Valor'].head(10) / 1000000):
-    ax.text(value, index, f'{round(value,2)} milhões de doláres', va='center', ha='left')
-
-sns.despine()
-ax.grid(True, linestyle='--') 
-
-# Mostrando o gráfico no Streamlit
-st.pyplot(fig)
+# Gráfico de barras do top 10 importadores
+top10 = cubo.top(10, 'Valor', ano_inicial=ANO_INICIAL)
+mostra_grafico(('top10', 'Valor', 1000000, impressao_digital(top10)), (12, 6),
+               lambda ax: plota_top10_importadores(top10, ax=ax),
+               lambda: vega_top10_importadores(top10))
 
 st.write("""
 O Paraguai se destaca como o maior importador de vinho da Vinícola, com um valor total de 42,86 milhões de dólares. Isso ressalta a forte demanda do Paraguai por nossos vinhos.
@@ -276,45 +204,45 @@ Aprofundando a análise nos 6 maiores importadores da Vinícola, apresentamos em
 coluna1, coluna2, coluna3 = st.columns(3)
 
 with coluna1:
-    fig, ax = plt.subplots(figsize=(6, 3.4))
+    mostra_grafico_pais(df_paraguai, "red", "Paraguai", (6, 3.4), divisor=1_000_000)
 
-    plota_grafico_pais_valor_ano_linha(df_paraguai, "red", "Paraguai", 1_000_000)
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
-
-    fig, ax = plt.subplots(figsize=(6, 3.05))
-
-    plota_grafico_pais_valor_ano_linha(df_china, "gold", "China", 1_000_000)
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+    mostra_grafico_pais(df_china, "gold", "China", (6, 3.05), divisor=1_000_000)
 
 with coluna2:
-    fig, ax = plt.subplots(figsize=(6, 3.35))
+    mostra_grafico_pais(df_russia, "blue", "Rússia", (6, 3.35), divisor=1_000_000)
 
-    plota_grafico_pais_valor_ano_linha(df_russia, "blue", "Rússia", 1_000_000)
+    mostra_grafico_pais(df_reino_unido, "pink", "Reino Unido", (6, 3.35), divisor=1_000_000)
 
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+with coluna3:
+    mostra_grafico_pais(df_estados_unidos, "black", "Estados Unidos", (6, 3.05))
 
-    fig, ax = plt.subplots(figsize=(6, 3.35))
+    mostra_grafico_pais(df_espanha, "green", "Espanha", (6, 3.15), divisor=1_000_000)
 
-    plota_grafico_pais_valor_ano_linha(df_reino_unido, "pink", "Reino Unido", 1_000_000)
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+st.write("""
+Para aprofundar a análise em qualquer outro mercado, selecione abaixo o país de destino e o intervalo de anos desejado:
+""")
 
-with coluna3:
-    fig, ax = plt.subplots(figsize=(6, 3.05))
+# Explorador por país: o país é localizado pelo índice do cubo (dicionário nome -> linha)
+# e o intervalo de anos é uma fatia das matrizes, sem percorrer a tabela longa a cada seleção
+paises_por_valor = cubo.top(None, 'Valor')['Destino'].tolist()
+# O cubo começa em ANO_INICIAL (os anos anteriores do CSV não são carregados), então o intervalo também
+ano_minimo, ano_maximo = int(cubo.anos[0]), int(cubo.anos[-1])
 
-    plota_grafico_pais_valor_ano_linha(df_estados_unidos, "black", "Estados Unidos")
+coluna1, coluna2 = st.columns([1, 2])
 
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+with coluna1:
+    pais_selecionado = st.selectbox('País de destino', paises_por_valor, key='explorador_pais')
+    ano_inicial_selecionado, ano_final_selecionado = st.slider('Intervalo de anos', ano_minimo, ano_maximo,
+                                                               (ANO_INICIAL, ano_maximo), key='explorador_anos',
+                                                               help=f'Os dados são carregados a partir de {ANO_INICIAL}')
 
-    fig, ax = plt.subplots(figsize=(6, 3.15))
+    st.metric('Valor total', formata_valor(cubo.total(pais_selecionado, 'Valor', ano_inicial_selecionado, ano_final_selecionado)))
+    st.metric('Quantidade total (litros)', formata_numero(cubo.total(pais_selecionado, 'Quantidade', ano_inicial_selecionado, ano_final_selecionado)))
 
-    plota_grafico_pais_valor_ano_linha(df_reino_unido, "green", "Espanha", 1_000_000)
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+with coluna2:
+    df_pais_selecionado = cubo.serie_df(pais_selecionado, ano_inicial_selecionado, ano_final_selecionado)
+    divisor = 1_000_000 if df_pais_selecionado['Valor'].max() >= 1_000_000 else 1
+    mostra_grafico_pais(df_pais_selecionado, "purple", pais_selecionado, (9, 3.5), divisor=divisor)
 
 st.write("""
 Considerando os dados apresentados, com finalidade de buscar insights valiosos para a Vinícola, realizamos o mapeamento das forças, fraquezas, oportunidades e ameaças (SWOT).         
@@ -373,27 +301,18 @@ Assim apresentamos abaixo 3 mercados que merecem uma atenção especial:
 coluna1, coluna2, coluna3 = st.columns(3)
 
 with coluna1:
-    fig, ax = plt.subplots(figsize=(6, 3.08))
-
-    plota_grafico_pais_valor_ano_linha(df_liberia, "red", "Libéria")
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+    mostra_grafico_pais(df_liberia, "red", "Libéria", (6, 3.08))
 
 with coluna2:
-    fig, ax = plt.subplots(figsize=(6, 3.48))
-
-    plota_grafico_pais_valor_ano_linha(df_arabia_saudita, "green", "Arábia Saudita")
-
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+    mostra_grafico_pais(df_arabia_saudita, "green", "Arábia Saudita", (6, 3.48))
 
 with coluna3:
-    fig, ax = plt.subplots(figsize=(6, 3.05))
-
-    plota_grafico_pais_valor_ano_linha(df_malavi, "black", "Malavi")
+    mostra_grafico_pais(df_malavi, "black", "Malavi", (6, 3.05))
 
-    # Mostrando o gráfico no Streamlit
-    st.pyplot(fig)
+# Ranking de todos os mercados em crescimento contínuo, calculado de forma vetorizada sobre o cubo
+with st.expander('Ranking dos mercados em crescimento'):
+    df_mercados_em_crescimento = mercados_em_crescimento(dados['crescimento'][DATASET_PRINCIPAL])
+    st.dataframe(df_mercados_em_crescimento, width=1250, hide_index=True)
 
 st.write("""
 
@@ -430,4 +349,10 @@ st.write("[2] https://revistacultivar.com.br/artigos/atuacao-do-brasil-no-mercad
 st.write("[3] https://www.meuvinho.com.br/news/547/grupo-miolo-atinge-valor-recorde-nas-exportacoes-em-2013%21")
 st.write("[4] https://pt.wikipedia.org/wiki/Guerra_Russo-Ucraniana")
 st.write("[5] https://oec.world/en/profile/bilateral-product/wine/reporter/lbr")
-st.write("[6] https://en.vogue.me/culture/saudi-arabia-serves-alcohol-sindalah-line-neom-beach-resort-wine-champagne-cocktails/")
\ No newline at end of file
+st.write("[6] https://en.vogue.me/culture/saudi-arabia-serves-alcohol-sindalah-line-neom-beach-resort-wine-champagne-cocktails/")
+
+# Painel de diagnóstico (apenas com INSTRUMENTACAO=1): tempo, CPU, memória e linhas de cada etapa desta execução
+if INSTRUMENTACAO_ATIVA:
+    with st.expander('Diagnóstico de desempenho'):
+        st.dataframe(coleta(), width=1250)
+        st.caption('O pico de memória é do processo inteiro: com várias sessões simultâneas, inclui as alocações das outras sessões.')
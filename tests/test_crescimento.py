@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from api import ServicoConsultas
+from crescimento import analisa_crescimento, mercados_em_crescimento
+from cubo import CuboAgregado
+
+## Indicadores de crescimento e a rota /crescimento da API
+
+CAMINHO_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')
+
+def cubo_pequeno():
+    medidas = {'Quantidade': np.array([[0, 100, 200, 400], [50, 40, 60, 70]]),
+               'Valor': np.array([[0, 10, 20, 40], [5, 4, 6, 7]])}
+    return CuboAgregado(['A', 'B'], np.arange(2020, 2024), medidas)
+
+def test_indicadores():
+    df = analisa_crescimento(cubo_pequeno()).set_index('País')
+    assert df.loc['A', 'SempreCrescente'] and not df.loc['B', 'SempreCrescente']
+    assert df.loc['A', 'SequenciaAtual'] == 3 and df.loc['B', 'MaiorSequencia'] == 2
+    assert df.loc['A', 'CAGR'] == pytest.approx(1.0)
+    assert df.loc['A', 'PrimeiroAno'] == 2021
+
+@pytest.mark.parametrize('ano_inicial, ano_final', [(1990, 2000), (2030, 2040)])
+def test_intervalo_fora_do_cubo(ano_inicial, ano_final):
+    df = analisa_crescimento(cubo_pequeno(), ano_inicial=ano_inicial, ano_final=ano_final)
+    assert df['Total'].tolist() == [0, 0]
+    assert df['CAGR'].isna().all() and df['Inclinacao'].isna().all()
+    assert mercados_em_crescimento(df, quantidade_minima=0).empty
+
+@pytest.fixture(scope='module')
+def servico(tmp_path_factory):
+    caminho = tmp_path_factory.mktemp('api') / 'ExpVinho.csv'
+    shutil.copy(CAMINHO_CSV, caminho)
+    return ServicoConsultas([str(caminho)])
+
+def test_api_crescimento_intervalo_vazio(servico):
+    corpo, _ = servico.responde('/crescimento', {'ano_inicial': '1990', 'ano_final': '2000'})
+    assert json.loads(corpo)['mercados'] == []
+
+def test_api_crescimento_padrao(servico):
+    corpo, _ = servico.responde('/crescimento', {})
+    assert [mercado['País'] for mercado in json.loads(corpo)['mercados']] == ['Libéria', 'Malavi', 'Arábia Saudita']
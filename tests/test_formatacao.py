@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from formatacao import formata_numero, formata_numeros, formata_valor, formata_valores
+
+## Formatação vetorizada x formatação valor a valor
+
+INTEIROS = [0, 1, -1, 9, 10, 999, 1000, -1000, 999_999, 1_000_000, -1_234_567, 10**15, 2**53]
+DECIMAIS = [0.0, -0.0, 0.004, -0.001, 0.005, 1.005, 2.675, -2.675, 999.995, -1234.5, 0.994, 0.996, 1e12 + 0.125]
+
+@pytest.mark.parametrize('valores', [
+    INTEIROS,
+    np.random.default_rng(0).integers(-10**12, 10**12, 10_000),
+])
+def test_inteiros(valores):
+    serie = pd.Series(valores, dtype=np.int64)
+    assert formata_numeros(serie).tolist() == serie.map(formata_numero).tolist()
+    assert formata_valores(serie).tolist() == serie.map(formata_valor).tolist()
+
+@pytest.mark.parametrize('valores', [
+    DECIMAIS,
+    np.random.default_rng(1).normal(0, 1e6, 10_000),
+    np.round(np.random.default_rng(2).uniform(-1e4, 1e4, 10_000), 3),
+])
+def test_decimais(valores):
+    serie = pd.Series(valores, dtype=np.float64)
+    assert formata_valores(serie).tolist() == serie.map(formata_valor).tolist()
+
+def test_preserva_indice_e_nome():
+    serie = pd.Series([1500, 2], index=[10, 20], name='Valor')
+    resultado = formata_valores(serie)
+    assert resultado.index.tolist() == [10, 20]
+    assert resultado.name == 'Valor'
+    assert resultado.tolist() == ['US$ 1.500,00', 'US$ 2,00']
+
+def test_serie_vazia():
+    assert formata_numeros(pd.Series([], dtype=np.int64)).tolist() == []
+    assert formata_valores(pd.Series([], dtype=np.float64)).tolist() == []
@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental import atualiza_fatos, verifica_incremental
+from ingestao import caminho_snapshot_fatos, descreve_dataset
+
+## Atualização incremental da tabela fato x ingestão completa
+
+CAMINHO_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ExpVinho.csv')
+
+@pytest.fixture
+def datasets(tmp_path):
+    caminho = tmp_path / 'ExpVinho.csv'
+    shutil.copy(CAMINHO_CSV, caminho)
+    datasets = [descreve_dataset(str(caminho))]
+    _, _, reprocessados = atualiza_fatos(datasets)
+    assert reprocessados == {'ExpVinho': None}
+    return datasets
+
+def le_largo(caminho):
+    return pd.read_csv(caminho, sep=';')
+
+def grava_largo(caminho, df):
+    # Grava o CSV no layout da Embrapa (cada ano repetido no cabeçalho) e muda a data de modificação
+    cabecalho = ['Id', 'País'] + [str(coluna).split('.')[0] for coluna in df.columns[2:]]
+    df.to_csv(caminho, sep=';', index=False, header=cabecalho)
+    info = os.stat(caminho)
+    os.utime(caminho, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+
+def acrescenta_ano(df, ano):
+    rng = np.random.default_rng(ano)
+    df = df.copy()
+    df[str(ano)] = rng.integers(0, 10_000, len(df))
+    df[f'{ano}.1'] = rng.integers(0, 10_000, len(df))
+    return df
+
+def partes(datasets):
+    with open(caminho_snapshot_fatos(datasets), encoding='utf-8') as arquivo:
+        return [parte['tabela'] for parte in json.load(arquivo)['partes']]
+
+def test_ano_acrescentado_le_so_as_colunas_novas(datasets, monkeypatch):
+    caminho = datasets[0]['arquivo']
+    grava_largo(caminho, acrescenta_ano(le_largo(caminho), 2024))
+    anteriores = partes(datasets)
+
+    lidas = []
+    le_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', lambda *args, **kwargs: lidas.append(kwargs.get('usecols')) or le_csv(*args, **kwargs))
+    df_fatos, cubos, reprocessados = atualiza_fatos(datasets)
+    monkeypatch.undo()
+
+    assert reprocessados == {'ExpVinho': [2024]}
+    assert [colunas for colunas in lidas if colunas] == [[0, 1, 110, 111]]
+    assert partes(datasets)[:-1] == anteriores and len(partes(datasets)) == 2
+    assert df_fatos['Ano'].max() == 2024 and cubos['ExpVinho'].anos[-1] == 2024
+    assert verifica_incremental(datasets)
+
+def test_anos_acrescentados_em_sequencia(datasets):
+    caminho = datasets[0]['arquivo']
+    df = le_largo(caminho)
+    for ano in (2024, 2025):
+        df = acrescenta_ano(df, ano)
+        grava_largo(caminho, df)
+        assert atualiza_fatos(datasets)[2] == {'ExpVinho': [ano]}
+
+    assert len(partes(datasets)) == 3
+    assert atualiza_fatos(datasets)[2] == {}
+    assert verifica_incremental(datasets)
+
+def test_ano_alterado_refaz_a_ingestao(datasets):
+    caminho = datasets[0]['arquivo']
+    df = le_largo(caminho)
+    df.loc[df['País'] == 'Paraguai', '2015'] += 1234
+    grava_largo(caminho, df)
+
+    _, cubos, reprocessados = atualiza_fatos(datasets)
+    assert reprocessados == {'ExpVinho': None}
+    anterior = int(le_largo(CAMINHO_CSV).set_index('País').loc['Paraguai', '2015'])
+    assert cubos['ExpVinho'].total('Paraguai', 'Quantidade', 2015, 2015) == anterior + 1234
+    assert verifica_incremental(datasets)
+
+def test_ano_removido_refaz_a_ingestao(datasets):
+    caminho = datasets[0]['arquivo']
+    df = le_largo(caminho)
+    grava_largo(caminho, acrescenta_ano(df, 2024))
+    atualiza_fatos(datasets)
+
+    grava_largo(caminho, df)
+    df_fatos, cubos, reprocessados = atualiza_fatos(datasets)
+    assert reprocessados == {'ExpVinho': None}
+    assert df_fatos['Ano'].max() == 2023 and cubos['ExpVinho'].anos[-1] == 2023
+    # As partes substituídas pela ingestão completa são apagadas
+    assert len(partes(datasets)) == 1
+    assert len(os.listdir(os.path.dirname(caminho_snapshot_fatos(datasets)))) == 3
+    assert verifica_incremental(datasets)
+
+def test_linha_nova_com_ano_acrescentado_refaz_a_ingestao(datasets):
+    caminho = datasets[0]['arquivo']
+    df = le_largo(caminho)
+    nova = df.iloc[[0]].assign(Id=df['Id'].max() + 1, **{'País': 'País novo'})
+    grava_largo(caminho, acrescenta_ano(pd.concat([df, nova], ignore_index=True), 2024))
+
+    _, cubos, reprocessados = atualiza_fatos(datasets)
+    assert reprocessados == {'ExpVinho': None}
+    assert 'País novo' in cubos['ExpVinho'].indice
+    assert len(partes(datasets)) == 1
+    assert verifica_incremental(datasets)
+
+def test_so_o_arquivo_alterado_e_lido(tmp_path, datasets):
+    caminho_importacao = tmp_path / 'ImpVinhos.csv'
+    shutil.copy(CAMINHO_CSV, caminho_importacao)
+    todos = datasets + [descreve_dataset(str(caminho_importacao))]
+    assert atualiza_fatos(todos)[2] == {'ExpVinho': None, 'ImpVinhos': None}
+
+    grava_largo(caminho_importacao, acrescenta_ano(le_largo(caminho_importacao), 2024))
+    _, cubos, reprocessados = atualiza_fatos(todos)
+    assert reprocessados == {'ImpVinhos': [2024]}
+    assert (cubos['ExpVinho'].anos[-1], cubos['ImpVinhos'].anos[-1]) == (2023, 2024)
+    assert verifica_incremental(todos)
+
+def test_sem_alteracao_le_o_snapshot(datasets):
+    _, _, reprocessados = atualiza_fatos(datasets)
+    assert reprocessados == {}
+
+def test_cubos_do_snapshot_iguais_aos_da_tabela(datasets):
+    df_fatos, cubos, _ = atualiza_fatos(datasets, ano_inicial=2009)
+    assert cubos['ExpVinho'].anos[0] == 2009
+    assert verifica_incremental(datasets, ano_inicial=2009)
+
+def test_parametros_diferentes_nao_compartilham_snapshot(datasets):
+    # Ex.: painel (ano_inicial=2009) e relatório com outro ano inicial sobre os mesmos arquivos
+    _, _, reprocessados = atualiza_fatos(datasets, ano_inicial=2015)
+    assert reprocessados == {'ExpVinho': None}
+    assert atualiza_fatos(datasets)[2] == {}
+    assert atualiza_fatos(datasets, ano_inicial=2015)[2] == {}
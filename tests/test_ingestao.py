@@ -0,0 +1,25 @@
+import pytest
+
+from ingestao import descreve_dataset
+
+## Descrição dos conjuntos de dados pelo nome do arquivo
+
+@pytest.mark.parametrize('caminho, produto, direcao', [
+    ('ExpVinho.csv', 'Vinhos de mesa', 'exportacao'),
+    ('dados/ImpEspumantes.csv', 'Espumantes', 'importacao'),
+    ('ExpUva.csv', 'Uvas frescas', 'exportacao'),
+    ('ImpSuco.csv', 'Suco de uva', 'importacao'),
+])
+def test_arquivos_de_comercio_exterior(caminho, produto, direcao):
+    descricao = descreve_dataset(caminho)
+    assert (descricao['produto'], descricao['direcao']) == (produto, direcao)
+
+@pytest.mark.parametrize('caminho', ['Producao.csv', 'Comercio.csv', 'ProcessaViniferas.csv', 'vinhos.csv'])
+def test_outros_arquivos_exigem_produto_e_direcao(caminho):
+    with pytest.raises(ValueError):
+        descreve_dataset(caminho)
+    with pytest.raises(ValueError):
+        descreve_dataset(caminho, produto='Vinhos de mesa')
+
+    descricao = descreve_dataset(caminho, produto='Vinhos de mesa', direcao='producao')
+    assert (descricao['produto'], descricao['direcao']) == ('Vinhos de mesa', 'producao')
@@ -0,0 +1,28 @@
+import io
+import json
+import logging
+
+import instrumentacao
+from instrumentacao import coleta, configura_log, etapa
+
+## Linhas de log em JSON das etapas, com a instrumentação ativa
+
+def test_etapa_emite_linha_json(monkeypatch, caplog):
+    monkeypatch.setattr(instrumentacao, 'ATIVA', True)
+    monkeypatch.setattr(instrumentacao.logger, 'handlers', [])
+    monkeypatch.setattr(instrumentacao.logger, 'level', logging.NOTSET)
+    monkeypatch.setattr(instrumentacao.logger, 'propagate', True)
+    # A raiz continua como o Streamlit a deixa: em WARNING
+    monkeypatch.setattr(logging.getLogger(), 'level', logging.WARNING)
+
+    saida = io.StringIO()
+    configura_log(saida)
+    instrumentacao.logger.addHandler(caplog.handler)
+    with etapa('externa'):
+        with etapa('interna', linhas=3):
+            pass
+
+    registros = [json.loads(registro.getMessage()) for registro in caplog.records if registro.name == 'instrumentacao']
+    assert [(r['etapa'], r['linhas'], r['nivel']) for r in registros] == [('interna', 3, 1), ('externa', None, 0)]
+    assert [json.loads(linha.split(' instrumentacao ', 1)[1]) for linha in saida.getvalue().splitlines()] == registros
+    assert coleta() == registros
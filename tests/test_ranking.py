@@ -0,0 +1,39 @@
+import pandas as pd
+
+from ranking import RankingDestinos
+
+## Ranking paginado com exportações e importações na mesma tabela
+
+def ranking():
+    return RankingDestinos(pd.DataFrame({
+        'Direcao': ['exportacao', 'importacao', 'exportacao', 'importacao', 'exportacao', 'importacao'],
+        'Produto': ['Vinhos de mesa'] * 6,
+        'Origem': ['Brasil', 'Chile', 'Brasil', 'Argentina', 'Brasil', 'Portugal'],
+        'Destino': ['Paraguai', 'Brasil', 'Rússia', 'Brasil', 'China', 'Brasil'],
+        'Quantidade': [60, 50, 40, 30, 20, 10],
+        'Valor': [600, 500, 400, 300, 200, 100],
+    }))
+
+def test_pagina_completa_na_ordem_da_metrica():
+    df, total, paginas = ranking().pagina(1, 10)
+    assert (total, paginas) == (6, 1)
+    assert df['Posição'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert df['Valor'].tolist() == [600, 500, 400, 300, 200, 100]
+
+def test_posicao_dentro_do_filtro():
+    df, total, _ = ranking().pagina(1, 10, filtros={'Direcao': 'importacao'})
+    assert total == 3
+    assert df['Origem'].tolist() == ['Chile', 'Argentina', 'Portugal']
+    assert df['Posição'].tolist() == [1, 2, 3]
+
+def test_ordem_crescente_e_paginas():
+    df, total, paginas = ranking().pagina(2, 4, decrescente=False)
+    assert (total, paginas) == (6, 2)
+    assert df['Valor'].tolist() == [500, 600]
+    assert df['Posição'].tolist() == [2, 1]
+
+def test_busca_pelo_pais_parceiro():
+    r = ranking()
+    assert r.pagina(1, 10, busca='chi')[0]['Direcao'].tolist() == ['importacao', 'exportacao']
+    assert r.pagina(1, 10, busca='BRASIL')[1] == 0
+    assert r.pagina(1, 10, busca='portugal')[0]['Posição'].tolist() == [1]
@@ -0,0 +1,41 @@
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+import pandas as pd
+
+from cubo import CuboAgregado
+from graficos import plota_top10_importadores, plota_total_por_ano
+from ingestao import descreve_dataset
+from relatorio import tarefas_do_relatorio
+
+## Textos e escalas dos gráficos do relatório de acordo com o conjunto de dados e o período
+
+def cubo():
+    return CuboAgregado.de_tabela(pd.DataFrame({
+        'Destino': ['Chile', 'Chile', 'Chile', 'Argentina', 'Argentina', 'Argentina'],
+        'Ano': [2014, 2015, 2016, 2014, 2015, 2016],
+        'Quantidade': [100, 200, 300, 40, 50, 60],
+        'Valor': [90_000_000, 80_000_000, 70_000_000, 3_000_000, 2_000_000, 1_000_000],
+    }))
+
+def test_textos_da_importacao_no_periodo_pedido():
+    tarefas, textos = tarefas_do_relatorio(cubo(), 2015, descreve_dataset('ImpVinhos.csv'))
+    assert textos['pagina'] == 'Análise das importações de vinhos de mesa (2015 a 2016)'
+
+    opcoes = {caminho: (parametros, extras) for caminho, _, parametros, extras in tarefas}
+    assert opcoes['total_valor.png'][0][3] == 'Total em dólares (US$) das importações de vinhos de mesa'
+    assert opcoes['top10.png'][1] == {'titulo': 'Top 10 origens das importações de vinhos de mesa em dólares (US$)',
+                                      'periodo': '2015 a 2016'}
+    assert opcoes['paises/chile.png'][1]['descricao'].format(pais='Chile') == 'das importações de vinhos de mesa vindas de Chile'
+    assert opcoes['paises/chile.png'][0][0]['Ano'].tolist() == [2015, 2016]
+
+def test_eixos_se_ajustam_aos_dados():
+    df_por_ano = cubo().totais_por_ano()
+    ax = Figure().subplots()
+    plota_total_por_ano(df_por_ano, 'Valor', 'green', 't', 'y', ax=ax)
+    assert ax.get_ylim()[0] == 0 and ax.get_ylim()[1] >= df_por_ano['Valor'].max() / 1000000
+
+    ax = Figure().subplots()
+    plota_top10_importadores(cubo().top(10), ax=ax, titulo='Top', periodo='2014 a 2016')
+    assert ax.get_title(loc='left') == 'Top\n2014 a 2016'
+    assert ax.get_xlim()[1] > 240